@@ -0,0 +1,106 @@
+from parse_questions_v3 import KEY_ANSWER_RE, KEY_HEADER, KEY_LINE_RE, LETTERS
+from text_dump import TextDump
+
+# Answer key ("CEVAP ANAHTARI") of a dump, kept in the parser's own shape
+# ({test id: {question number: letter}}), and the checks run against the
+# parsed tests: missing answers, tests whose question count doesn't match
+# the key, skewed letter distributions. A booklet's key is a few hundred
+# letters, so plain dicts are all it needs.
+#
+#   table = read_answer_table('pdf_content.txt')
+#   table.letter(3, 7)                      # 'C'
+#   table.check({1: 12, 2: 11, ...})        # {"countMismatch": {2: ...}, ...}
+
+# A letter holding more than this share of a test's answers is suspicious
+# (a uniform key is 25% each); only checked for tests with enough answers
+SKEW_SHARE = 0.5
+SKEW_MIN_ANSWERS = 8
+
+
+class AnswerKeyTable:
+    def __init__(self, rows):
+        # rows: {test id: {question number: letter}}, as built by the parser.
+        # Ids below 1 ("Test 0" misread from the PDF) are dropped
+        self.rows = {test_id: {q_id: letter for q_id, letter in answers.items() if q_id >= 1}
+                     for test_id, answers in rows.items() if test_id >= 1}
+        self.present = sorted(self.rows)
+        self.test_count = max(self.present, default=0)
+        self.question_count = max((q_id for answers in self.rows.values() for q_id in answers), default=0)
+
+    @classmethod
+    def from_lines(cls, lines):
+        # Same line rules as tokenize_keys; a repeated test line replaces
+        # the earlier one, as it does in the parser's answer_keys
+        rows = {}
+        for line in lines:
+            match = KEY_LINE_RE.search(line)
+            if match:
+                rows[int(match.group(1))] = {int(q_id): letter for q_id, letter in KEY_ANSWER_RE.findall(match.group(2))}
+        return cls(rows)
+
+    def letter(self, test_id, q_id):
+        return self.rows.get(test_id, {}).get(q_id)
+
+    def key_map(self, test_id):
+        return dict(self.rows.get(test_id, {}))
+
+    def answer_keys(self):
+        return {test_id: self.key_map(test_id) for test_id in self.present}
+
+    def check(self, question_counts=None):
+        # question_counts: {test id: questions parsed}. Without it, every
+        # test is expected to be keyed up to its highest keyed question.
+        issues = {
+            "missingTests": sorted(set(question_counts or {}) - set(self.present)),
+            "missingAnswers": {},
+            "countMismatch": {},
+            "letterSkew": {}
+        }
+        for test_id in self.present:
+            answers = self.rows[test_id]
+            expected = max(answers, default=0)
+            if question_counts and test_id in question_counts:
+                expected = min(question_counts[test_id], self.question_count)
+            holes = [q_id for q_id in range(1, expected + 1) if q_id not in answers]
+            if holes:
+                issues["missingAnswers"][test_id] = holes
+
+            keyed = len(answers)
+            if question_counts is not None and question_counts.get(test_id, 0) != keyed:
+                issues["countMismatch"][test_id] = {"questions": question_counts.get(test_id, 0), "keyed": keyed}
+            counts = [list(answers.values()).count(letter) for letter in LETTERS]
+            if keyed >= SKEW_MIN_ANSWERS and max(counts) > SKEW_SHARE * keyed:
+                issues["letterSkew"][test_id] = dict(zip(LETTERS, counts))
+        return {name: found for name, found in issues.items() if found}
+
+
+def read_answer_table(file_path):
+    # Decodes only the key section, found through the dump's line index
+    with TextDump(file_path) as dump:
+        key_start = dump.find_line(KEY_HEADER, last=True)
+        if key_start is None:
+            return AnswerKeyTable({})
+        return AnswerKeyTable.from_lines(dump.lines(key_start + 1))
+
+
+def key_section(lines):
+    # Lines after the last answer key header, for dumps already in memory
+    start = 0
+    for i, line in enumerate(lines):
+        if KEY_HEADER in line:
+            start = i + 1
+    return lines[start:] if start else []
+
+
+def describe_issues(issues):
+    messages = []
+    for test_id in issues.get("missingTests", []):
+        messages.append(f"Test {test_id}: no answer key")
+    for test_id, q_ids in issues.get("missingAnswers", {}).items():
+        messages.append(f"Test {test_id}: no key for Q{', Q'.join(map(str, q_ids))}")
+    for test_id, counts in issues.get("countMismatch", {}).items():
+        messages.append(f"Test {test_id}: {counts['questions']} questions but {counts['keyed']} keyed")
+    for test_id, counts in issues.get("letterSkew", {}).items():
+        spread = " ".join(f"{letter}={n}" for letter, n in counts.items())
+        messages.append(f"Test {test_id}: skewed answer letters ({spread})")
+    return messages
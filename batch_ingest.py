@@ -0,0 +1,196 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import instrument
+from answer_key import AnswerKeyTable, key_section
+from check_json import new_summary, validate_tests
+from cleanup_json_v2 import clean_tests
+from noise_filter import learn_lines
+from parse_questions_v3 import GRADE_HEADER_RE, KEY_HEADER, NOISE_FILTER, PAGE_MARKER_PREFIX, is_structural, parse_lines
+from pdf_backends import BACKENDS, DEFAULT_BACKEND, choose_backend
+from pipeline import write_json_atomic
+
+# Ingest every booklet in a folder: PDFs or text dumps, one worker process
+# per file. Writes one JSON per booklet plus index.json. A file that fails
+# is recorded in the index and the rest of the batch carries on. A .txt
+# file only counts as a dump if it has a page marker, a "5. Sınıf" page
+# header or the answer key header; READMEs and notes are skipped.
+#
+#   python batch_ingest.py booklets/ -o src/data/booklets --workers 4
+
+INDEX_NAME = 'index.json'
+
+# A booklet still unfinished after this many broken pools runs on its own
+ISOLATE_AFTER_BREAKS = 2
+
+
+def is_text_dump(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith(PAGE_MARKER_PREFIX) or KEY_HEADER in line or GRADE_HEADER_RE.match(line):
+                    return True
+    except (OSError, UnicodeDecodeError):
+        pass
+    return False
+
+
+def discover_booklets(input_dir):
+    # A text dump next to its PDF wins, it is already extracted
+    found = {}
+    for name in sorted(os.listdir(input_dir)):
+        stem, ext = os.path.splitext(name)
+        ext = ext.lower()
+        path = os.path.join(input_dir, name)
+        if ext == '.txt':
+            if is_text_dump(path):
+                found[stem] = path
+            else:
+                print(f"Skipping {name}: not a booklet text dump")
+        elif ext == '.pdf' and stem not in found:
+            found[stem] = path
+    return [found[stem] for stem in sorted(found)]
+
+
+def booklet_lines(path, backend=DEFAULT_BACKEND):
+    if path.lower().endswith('.pdf'):
+        # PDF libraries are only imported when a PDF is opened
+        from extract_pdf_to_file import format_page, iter_page_texts
+        from pdf_backends import open_document
+
+        document = open_document(path, backend)
+        try:
+            for page_num, text in iter_page_texts(document):
+                yield from format_page(page_num, text).splitlines()
+        finally:
+            document.close()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from f
+
+
+def output_name(path):
+    # booklet.pdf -> booklet.json; index.pdf keeps its extension
+    # (index.pdf.json) so it can't overwrite the batch index
+    source = os.path.basename(path)
+    name = os.path.splitext(source)[0] + '.json'
+    return source + '.json' if name.lower() == INDEX_NAME else name
+
+
+def ingest_booklet(path, output_dir, backend=DEFAULT_BACKEND):
+    # Runs in a worker process
+    record = {"source": os.path.basename(path), "output": output_name(path)}
+    try:
+        summary = new_summary()
+        instrument.configure(instrument.QUIET)
+        lines = list(booklet_lines(path, backend))
+        # Each booklet has its own running headers and footers
+        noise = NOISE_FILTER.with_lines(learn_lines(lines, is_structural))
+        tests = list(validate_tests(clean_tests(parse_lines(lines, noise)), summary))
+        if not tests:
+            raise ValueError("no questions found")
+        key_issues = AnswerKeyTable.from_lines(key_section(lines)).check(dict(summary['tests']))
+        write_json_atomic(os.path.join(output_dir, record['output']), {"tests": tests})
+    except Exception as e:
+        del record['output']
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+        return record
+
+    record.update(
+        status="ok",
+        tests=len(tests),
+        questions=summary['total_questions'],
+        validAnswers=summary['valid_answers']
+    )
+    if key_issues:
+        record['keyIssues'] = key_issues
+    return record
+
+
+def build_index(records):
+    records = sorted(records, key=lambda r: r['source'])
+    return {
+        "booklets": records,
+        "ok": sum(1 for r in records if r['status'] == "ok"),
+        "failed": sum(1 for r in records if r['status'] != "ok")
+    }
+
+
+def worker_failure(path, error):
+    # The worker itself died (e.g. crashed inside a PDF library)
+    return {"source": os.path.basename(path), "status": "error", "error": f"{type(error).__name__}: {error}"}
+
+
+def run_jobs(paths, output_dir, workers=None, backend=DEFAULT_BACKEND):
+    # Yields one record per booklet as it finishes. A worker that dies
+    # breaks the whole pool and every unfinished job with it, so those are
+    # resubmitted to a fresh pool. The booklet that crashed is unfinished
+    # every time, so after ISOLATE_AFTER_BREAKS it runs in a pool of its
+    # own, where a crash can only be its own.
+    breaks = dict.fromkeys(paths, 0)
+    pending = list(paths)
+    while pending:
+        for path in [path for path in pending if breaks[path] >= ISOLATE_AFTER_BREAKS]:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                try:
+                    yield pool.submit(ingest_booklet, path, output_dir, backend).result()
+                except Exception as e:
+                    yield worker_failure(path, e)
+        pending = [path for path in pending if breaks[path] < ISOLATE_AFTER_BREAKS]
+        if not pending:
+            break
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(ingest_booklet, path, output_dir, backend): path for path in pending}
+            pending = []
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    breaks[path] += 1
+                    pending.append(path)
+                    continue
+                except Exception as e:
+                    record = worker_failure(path, e)
+                yield record
+        if pending:
+            print(f"A worker crashed, retrying {len(pending)} unfinished booklets")
+
+
+def run_batch(input_dir, output_dir, workers=None, backend="auto"):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = discover_booklets(input_dir)
+    records = []
+
+    # Chosen once here rather than per worker, so calibration runs at most once
+    pdfs = [path for path in paths if path.lower().endswith('.pdf')]
+    if pdfs:
+        backend = choose_backend(backend, pdfs[0])
+
+    for record in run_jobs(paths, output_dir, workers, backend):
+        records.append(record)
+        if record['status'] == "ok":
+            print(f"{record['source']}: {record['tests']} tests, {record['questions']} questions")
+        else:
+            print(f"{record['source']}: FAILED ({record['error']})")
+
+    index = build_index(records)
+    write_json_atomic(os.path.join(output_dir, INDEX_NAME), index)
+    print(f"Ingested {index['ok']} of {len(records)} booklets into {output_dir}")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest every booklet (PDF or text dump) in a folder.")
+    parser.add_argument("input_dir")
+    parser.add_argument("-o", "--output-dir", default='src/data/booklets')
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: one per CPU core)")
+    parser.add_argument("-b", "--backend", default="auto", choices=["auto", *BACKENDS],
+                        help="PDF library for PDF inputs (auto = fastest acceptable, from calibration)")
+    args = parser.parse_args()
+
+    run_batch(args.input_dir, args.output_dir, args.workers, args.backend)
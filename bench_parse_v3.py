@@ -0,0 +1,101 @@
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import tempfile
+import time
+import types
+
+import parse_questions_v3
+
+# Micro-benchmark: the lexer-based parse_questions_v3.parse_lines against
+# the per-line re.match parser it replaced, loaded from git at runtime so
+# there is no copy to drift. The baseline reads a file and saves its JSON
+# at the end; it runs in a scratch folder and the save is skipped, so both
+# sides time reading and parsing only.
+#
+#   python bench_parse_v3.py [text dump] [repeat factor] [--baseline REV]
+#
+# The gain is modest. The lexer does work the baseline skips (marker checks
+# per option, the learned noise filter, numbered lists inside passages,
+# page headers), and is only about 1.15x faster on the 20x dump, with runs
+# from 0.95x to 1.3x on a busy machine. Its first version measured 1.5x.
+# Profiling leaves no single hot spot: about half the time is the
+# tokenize loop itself, about a quarter of that the noise regex on text
+# lines.
+
+# The last commit with the per-line parser
+BASELINE_REV = "3cbecd7"
+
+
+def load_baseline(rev=BASELINE_REV):
+    source = subprocess.run(["git", "show", f"{rev}:parse_questions_v3.py"], capture_output=True, text=True,
+                            encoding='utf-8', check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    module = types.ModuleType("baseline_parse_questions_v3")
+    exec(compile(source, f"{rev}:parse_questions_v3.py", 'exec'), module.__dict__)
+    # Its result only exists as the saved JSON: keep it instead of writing it
+    module.saved = []
+    module.json = types.SimpleNamespace(dump=lambda data, f, **kwargs: module.saved.append(data['tests']))
+    return module
+
+
+def scaled_lines(file_path, factor):
+    # Repeat the question section to simulate bigger booklets, keep one key
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    key_start = next((i for i, line in enumerate(lines) if "CEVAP ANAHTARI" in line), len(lines))
+    return lines[:key_start] * factor + lines[key_start:]
+
+
+def best_times(funcs, path, rounds=10):
+    # Fastest run of each, taking turns so a change in machine load hits
+    # all of them alike
+    best = [None] * len(funcs)
+    results = [None] * len(funcs)
+    for _ in range(rounds):
+        for i, func in enumerate(funcs):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                results[i] = func(path)
+                elapsed = time.perf_counter() - start
+            best[i] = elapsed if best[i] is None else min(best[i], elapsed)
+    return best, results
+
+
+def parse_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_questions_v3.parse_lines(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time parse_questions_v3 against the parser it replaced.")
+    parser.add_argument("input", nargs="?", default='pdf_content.txt')
+    parser.add_argument("factor", nargs="?", type=int, default=20, help="times the question section is repeated")
+    parser.add_argument("--baseline", default=BASELINE_REV, help="git revision of the per-line parser")
+    args = parser.parse_args()
+
+    lines = scaled_lines(args.input, args.factor)
+    baseline = load_baseline(args.baseline)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'dump.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        # The baseline opens its output path relative to the working folder
+        os.makedirs(os.path.join(work_dir, 'src', 'data'))
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            (legacy_time, new_time), (_, new_tests) = best_times([baseline.parse_pdf_content, parse_file], path)
+        finally:
+            os.chdir(cwd)
+
+    print(f"Lines: {len(lines)} ({args.factor}x {args.input})")
+    print(f"Baseline parser ({args.baseline}): {legacy_time * 1000:.1f} ms")
+    print(f"Lexer parser:  {new_time * 1000:.1f} ms ({legacy_time / new_time:.2f}x)")
+    # Options are split differently since the option splitter rewrite, and
+    # tests are cut at page headers since the boundary detector, so only
+    # the totals are comparable
+    def count(tests):
+        return f"{len(tests)} tests, {sum(len(t['questions']) for t in tests)} questions"
+    print(f"Baseline: {count(baseline.saved[-1])}, lexer: {count(new_tests)}")
@@ -0,0 +1,133 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import parse_questions
+import parse_questions_v2
+import parse_questions_v3
+from synthetic_booklet import generate_booklet
+
+# Throughput, peak memory and accuracy of every parser generation on a
+# synthetic booklet with known ground truth.
+#
+#   python bench_parsers.py --tests 160 --repeat 3 [--json report.json]
+
+
+def parse_v3(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_questions_v3.parse_lines(f)
+
+
+PARSERS = {
+    "v1": parse_questions.parse_pdf_content,
+    "v2": parse_questions_v2.parse_tests,
+    "v3": parse_v3,
+}
+
+
+def normalize(text):
+    return " ".join(str(text).split())
+
+
+def score(parsed, truth):
+    # Questions are matched on (test id, question id); the first parsed
+    # question with a given id wins, anything left over is spurious.
+    index = {}
+    parsed_count = 0
+    for t in parsed:
+        for q in t['questions']:
+            parsed_count += 1
+            index.setdefault((t['id'], q['id']), q)
+
+    total = found = text_ok = options_ok = answer_ok = 0
+    for t in truth:
+        for q in t['questions']:
+            total += 1
+            p = index.get((t['id'], q['id']))
+            if p is None:
+                continue
+            found += 1
+            if normalize(p['text']) == normalize(q['text']):
+                text_ok += 1
+            if [normalize(o) for o in p['options']] == q['options']:
+                options_ok += 1
+            if p.get('correctAnswer') == q['correctAnswer']:
+                answer_ok += 1
+
+    return {
+        "questions": total,
+        "found": found / total,
+        "text": text_ok / total,
+        "options": options_ok / total,
+        "answers": answer_ok / total,
+        "spurious": parsed_count - found
+    }
+
+
+def run_parser(func, path, repeat):
+    # Parsers print progress; keep that out of the timings' terminal I/O
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            parsed = func(path)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Separate run for memory, tracemalloc slows parsing down
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, parsed
+
+
+def run_benchmark(tests, repeat, seed=0, parsers=PARSERS):
+    lines, truth = generate_booklet(tests, seed)
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+    results = {}
+    try:
+        for name, func in parsers.items():
+            elapsed, peak, parsed = run_parser(func, path, repeat)
+            results[name] = {
+                "seconds": elapsed,
+                "linesPerSecond": len(lines) / elapsed,
+                "peakBytes": peak,
+                **score(parsed, truth)
+            }
+    finally:
+        os.remove(path)
+
+    return {"tests": tests, "lines": len(lines), "seed": seed, "parsers": results}
+
+
+def print_report(report):
+    print(f"Synthetic booklet: {report['tests']} tests, {report['lines']} lines (seed {report['seed']})")
+    print(f"{'parser':<8}{'ms':>9}{'lines/s':>11}{'peak KB':>10}{'found':>8}{'text':>8}{'options':>9}{'answers':>9}{'spurious':>10}")
+    for name, r in report['parsers'].items():
+        print(f"{name:<8}{r['seconds'] * 1000:>9.1f}{r['linesPerSecond']:>11.0f}{r['peakBytes'] / 1024:>10.0f}"
+              f"{r['found']:>8.1%}{r['text']:>8.1%}{r['options']:>9.1%}{r['answers']:>9.1%}{r['spurious']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the question parsers on a synthetic booklet.")
+    parser.add_argument("--tests", type=int, default=160, help="tests in the synthetic booklet")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per parser (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report as JSON here")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.tests, args.repeat, args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
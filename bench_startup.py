@@ -0,0 +1,98 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from engquest_ingest import STARTUP_BUDGET_MS
+
+# Startup time of engquest_ingest.py, measured as "<subcommand> --help" on
+# top of a bare interpreter start, against STARTUP_BUDGET_MS. Also fails
+# when a heavy module gets imported before a subcommand actually runs, or
+# when the top-level --help imports any of the scripts. --help alone
+# doesn't show what a run in the batch files' loops costs, so a few cheap
+# real invocations are timed too (reported, not held to the budget).
+#
+#   python bench_startup.py [--repeat 20]
+
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'engquest_ingest.py')
+COMMANDS = ["extract", "parse", "consensus", "clean", "check", "export", "audio"]
+HEAVY_MODULES = {"pypdf", "PyPDF2", "pdfminer", "numpy", "multiprocessing"}
+# A subcommand's --help imports its own script for the options
+SCRIPT_MODULES = {"extract_pdf_to_file", "parse_questions_v3", "consensus_parse", "export_bank", "build_audio",
+                  "pipeline", "answer_key", "pdf_backends", "page_cache"}
+ROOT = os.path.dirname(CLI)
+SCREENING_PATH = os.path.join(ROOT, 'src', 'data', 'screening_questions.json')
+DUMP_PATH = os.path.join(ROOT, 'pdf_content.txt')
+
+
+def real_commands(work_dir):
+    # Small jobs the batch files run: cleaning a bank, and re-parsing a dump
+    # with a warm parse cache (the cache lands in work_dir, the cwd)
+    bank = os.path.join(work_dir, 'questions.json')
+    shutil.copy(SCREENING_PATH, bank)
+    return {
+        "clean": ["clean", bank],
+        "parse": ["parse", DUMP_PATH, "-o", bank, "-q"],
+    }
+
+
+BASELINE = [sys.executable, "-c", "pass"]
+
+
+def run_time(command, cwd=None):
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, cwd=cwd)
+    return (time.perf_counter() - start) * 1000
+
+
+def overhead(command, repeat, cwd=None):
+    # Fastest command run minus fastest bare interpreter start, the two
+    # interleaved so a change in machine load hits both alike; the slower
+    # runs are mostly scheduler noise
+    command_times, baseline_times = [], []
+    for _ in range(repeat):
+        baseline_times.append(run_time(BASELINE))
+        command_times.append(run_time(command, cwd))
+    return min(command_times) - min(baseline_times), min(baseline_times)
+
+
+def imported_modules(command):
+    # Top-level packages listed by -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", *command],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check engquest_ingest.py startup time against its budget.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    over = False
+    baselines = []
+    for command in [[]] + [[name] for name in COMMANDS]:
+        argv = [CLI, *command, "--help"]
+        extra, baseline = overhead([sys.executable, *argv], args.repeat)
+        baselines.append(baseline)
+        heavy = sorted(imported_modules(argv) & (HEAVY_MODULES if command else HEAVY_MODULES | SCRIPT_MODULES))
+        ok = extra <= STARTUP_BUDGET_MS and not heavy
+        over = over or not ok
+        label = " ".join(command) or "(none)"
+        print(f"  {label:9} +{extra:5.1f} ms{'' if ok else '  OVER BUDGET'}"
+              + (f"  imports {', '.join(heavy)}" if heavy else ""))
+
+    print(f"Budget: +{STARTUP_BUDGET_MS} ms (interpreter {min(baselines):.1f} ms)")
+
+    print("Real runs:")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for label, command in real_commands(work_dir).items():
+            extra, _ = overhead([sys.executable, CLI, *command], args.repeat, cwd=work_dir)
+            print(f"  {label:9} +{extra:5.1f} ms")
+    sys.exit(1 if over else 0)
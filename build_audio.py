@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+
+import instrument
+from pipeline import write_json_atomic
+
+# Pre-rendered speech for the flashcards' "audio" strings, so the school
+# machines play a file instead of synthesizing speech at play time.
+#
+# Every unique string across the units is rendered once through a local
+# offline TTS program, compressed when an encoder is installed, and saved
+# under a content-addressed name: a hash of the text and the voice
+# settings. A string that is already on disk under its name is never
+# rendered again, so only new or changed strings cost anything; files no
+# longer referenced are removed. The manifest lists each unit's clips for
+# preloading:
+#
+#   {"backend": "espeak-ng:en-gb:140", "units": {"1": {"Hello": "3f2a...ogg", ...}}}
+#
+#   python build_audio.py [-o public/audio] [-b auto|espeak-ng|pico2wave|piper] [--voice V]
+#
+# subprocess, tempfile and the thread pool are imported where they are
+# used, so "engquest_ingest.py audio --help" stays within its budget.
+
+CURRICULUM_PATH = 'src/data/english_curriculum.json'
+AUDIO_DIR = 'public/audio'
+MANIFEST_NAME = 'manifest.json'
+AUDIO_EXTENSIONS = ('.ogg', '.wav')
+
+
+class EspeakBackend:
+    name = "espeak-ng"
+    program = "espeak-ng"
+    default_voice = "en-gb"
+    speed = 140     # words per minute; espeak's default is fast for grade 5
+
+    def __init__(self, voice=None):
+        self.voice = voice or self.default_voice
+
+    def key(self):
+        # Part of every file name: other settings must not reuse a clip
+        return f"{self.name}:{self.voice}:{self.speed}"
+
+    def render(self, text, wav_path):
+        import subprocess
+
+        # Text on stdin, so strings starting with "-" aren't read as options
+        subprocess.run([self.program, "-v", self.voice, "-s", str(self.speed), "-w", wav_path, "--stdin"],
+                       input=text, text=True, check=True, capture_output=True)
+
+
+class Pico2waveBackend:
+    name = "pico2wave"
+    program = "pico2wave"
+    default_voice = "en-GB"
+
+    def __init__(self, voice=None):
+        self.voice = voice or self.default_voice
+
+    def key(self):
+        return f"{self.name}:{self.voice}"
+
+    def render(self, text, wav_path):
+        import subprocess
+
+        subprocess.run([self.program, "-l", self.voice, "-w", wav_path, "--", text], check=True, capture_output=True)
+
+
+class PiperBackend:
+    # The voice is the path of a downloaded .onnx model
+    name = "piper"
+    program = "piper"
+    default_voice = None
+
+    def __init__(self, voice=None):
+        if not voice:
+            raise ValueError("piper needs --voice pointing to a .onnx voice model")
+        self.voice = voice
+
+    def key(self):
+        return f"{self.name}:{os.path.basename(self.voice)}"
+
+    def render(self, text, wav_path):
+        import subprocess
+
+        subprocess.run([self.program, "--model", self.voice, "--output_file", wav_path],
+                       input=text, text=True, check=True, capture_output=True)
+
+
+BACKENDS = {cls.name: cls for cls in (EspeakBackend, Pico2waveBackend, PiperBackend)}
+
+
+def is_available(name):
+    return shutil.which(BACKENDS[name].program) is not None
+
+
+def choose_backend(requested="auto", voice=None):
+    if requested != "auto":
+        if requested not in BACKENDS:
+            raise ValueError(f"Unknown TTS backend {requested!r}, choose from {', '.join(BACKENDS)}")
+        if not is_available(requested):
+            raise ValueError(f"TTS backend {requested!r} is not installed")
+        return BACKENDS[requested](voice)
+    for name, cls in BACKENDS.items():
+        # piper can't run without a model, so auto only picks it with --voice
+        if is_available(name) and (cls.default_voice or voice):
+            return cls(voice)
+    raise ValueError(f"No TTS program installed, install one of {', '.join(BACKENDS)}")
+
+
+def encoder():
+    # (extension, command builder) for the first installed encoder; plain
+    # WAV when there is none
+    if shutil.which("oggenc"):
+        return ".ogg", lambda wav, out: ["oggenc", "--quiet", "-q", "2", "-o", out, wav]
+    if shutil.which("ffmpeg"):
+        return ".ogg", lambda wav, out: ["ffmpeg", "-v", "error", "-y", "-i", wav, "-c:a", "libvorbis",
+                                         "-q:a", "2", out]
+    return ".wav", None
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def unit_clips(curriculum):
+    # {unit id: [audio strings in card order]}, each string once per unit
+    units = {}
+    for unit in curriculum['units']:
+        texts = units.setdefault(str(unit['id']), [])
+        for card in unit.get('flashcards', []):
+            text = normalize(card.get('audio') or "")
+            if text and text not in texts:
+                texts.append(text)
+    return units
+
+
+def clip_name(backend_key, text, extension):
+    return hashlib.sha1(f"{backend_key}\n{text}".encode('utf-8')).hexdigest()[:16] + extension
+
+
+def render_clip(backend, text, path, encode):
+    # Render into a scratch folder and move into place at the end, so an
+    # interrupted build never leaves a truncated clip under a valid name
+    import subprocess
+    import tempfile
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(path)) as scratch:
+        wav_path = os.path.join(scratch, "clip.wav")
+        backend.render(text, wav_path)
+        if encode is None:
+            os.replace(wav_path, path)
+        else:
+            out_path = os.path.join(scratch, "clip" + os.path.splitext(path)[1])
+            subprocess.run(encode(wav_path, out_path), check=True, capture_output=True)
+            os.replace(out_path, path)
+
+
+def build_audio(curriculum, audio_dir=AUDIO_DIR, backend=None, workers=None):
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+
+    backend = backend or choose_backend()
+    extension, encode = encoder()
+    os.makedirs(audio_dir, exist_ok=True)
+
+    units = unit_clips(curriculum)
+    names = {text: clip_name(backend.key(), text, extension) for texts in units.values() for text in texts}
+    missing = {text: name for text, name in names.items() if not os.path.exists(os.path.join(audio_dir, name))}
+    instrument.count("clips", len(names))
+    instrument.count("rendered", len(missing))
+
+    # The work is in the TTS and encoder processes, so threads are enough
+    # to keep every core busy
+    failed = {}
+    with instrument.stage("render"), ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {text: pool.submit(render_clip, backend, text, os.path.join(audio_dir, name), encode)
+                   for text, name in missing.items()}
+        for text, future in futures.items():
+            try:
+                future.result()
+                instrument.log(instrument.DEBUG, f"Rendered {text!r}")
+            except subprocess.CalledProcessError as e:
+                stderr = e.stderr.decode('utf-8', 'replace') if isinstance(e.stderr, bytes) else e.stderr
+                failed[text] = (stderr or str(e)).strip()
+            except OSError as e:
+                failed[text] = str(e)
+
+    # Failed strings stay out of the manifest; the app falls back to
+    # speech synthesis for them
+    manifest = {
+        "backend": backend.key(),
+        "units": {unit_id: {text: names[text] for text in texts if text not in failed}
+                  for unit_id, texts in units.items()}
+    }
+    write_json_atomic(os.path.join(audio_dir, MANIFEST_NAME), manifest, indent=None)
+
+    keep = set(names.values())
+    removed = 0
+    for name in os.listdir(audio_dir):
+        if name.endswith(AUDIO_EXTENSIONS) and name not in keep:
+            os.remove(os.path.join(audio_dir, name))
+            removed += 1
+    instrument.count("removed", removed)
+    return manifest, missing, failed
+
+
+def add_arguments(parser):
+    # Shared with engquest_ingest.py's audio subcommand
+    parser.add_argument("input", nargs="?", default=CURRICULUM_PATH)
+    parser.add_argument("-o", "--output-dir", default=AUDIO_DIR)
+    parser.add_argument("-b", "--backend", default="auto", choices=["auto", *BACKENDS],
+                        help="TTS program (auto = first installed of espeak-ng, pico2wave, piper)")
+    parser.add_argument("--voice", help="espeak-ng voice, pico2wave language, or piper .onnx model")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="clips rendered at once (0 = one per CPU core)")
+    instrument.add_arguments(parser)
+
+
+def main(args):
+    import json
+
+    instrument.configure(args.verbosity, args.profile)
+    try:
+        backend = choose_backend(args.backend, args.voice)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        curriculum = json.load(f)
+    with instrument.profiled():
+        manifest, rendered, failed = build_audio(curriculum, args.output_dir, backend, args.workers or None)
+
+    for text, error in failed.items():
+        print(f"  Failed {text!r}: {error}")
+    clips = {name for texts in manifest['units'].values() for name in texts.values()}
+    instrument.log(instrument.INFO, f"{len(clips)} clips for {len(manifest['units'])} units with {backend.key()}, "
+                   f"{len(rendered) - len(failed)} rendered, {instrument.counters.get('removed', 0)} removed "
+                   f"-> {args.output_dir}")
+    if args.report:
+        instrument.write_report(args.report)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the flashcard audio strings to cached speech files.")
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
@@ -1,22 +1,40 @@
 import json
 
-with open('src/data/screening_questions.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
-tests = data['tests']
-total_q = 0
-valid_a = 0
-
-for t in tests:
-    print(f"Test {t['id']}: {len(t['questions'])} questions")
-    for q in t['questions']:
-        total_q += 1
-        if q['correctAnswer'] != -1:
-            valid_a += 1
-        else:
-            # Print first few failures
-            if total_q < 5:
-                print(f"  Failed Q{q['id']}: Key might be missing or content mismatch.")
-
-print(f"Total Questions: {total_q}")
-print(f"Valid Answers: {valid_a}")
+
+def new_summary():
+    return {"tests": [], "total_questions": 0, "valid_answers": 0, "failed": []}
+
+
+def validate_tests(tests, summary):
+    # Generator stage: passes tests through unchanged while counting answers
+    for t in tests:
+        summary['tests'].append((t['id'], len(t['questions'])))
+        for q in t['questions']:
+            summary['total_questions'] += 1
+            if q['correctAnswer'] != -1:
+                summary['valid_answers'] += 1
+            else:
+                summary['failed'].append((t['id'], q['id']))
+        yield t
+
+
+def print_summary(summary):
+    for test_id, count in summary['tests']:
+        print(f"Test {test_id}: {count} questions")
+
+    # Print first few failures
+    for test_id, q_id in summary['failed'][:5]:
+        print(f"  Failed Test {test_id} Q{q_id}: Key might be missing or content mismatch.")
+
+    print(f"Total Questions: {summary['total_questions']}")
+    print(f"Valid Answers: {summary['valid_answers']}")
+
+
+if __name__ == "__main__":
+    with open('src/data/screening_questions.json', 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    summary = new_summary()
+    for _ in validate_tests(data['tests'], summary):
+        pass
+    print_summary(summary)
@@ -1,17 +1,19 @@
-try:
-    import pypdf
-    print("pypdf found")
-except ImportError:
-    print("pypdf not found")
+import sys
 
-try:
-    import pdfminer
-    print("pdfminer found")
-except ImportError:
-    print("pdfminer not found")
+from pdf_backends import BACKENDS, backend_version, calibrate, is_available
 
-try:
-    import PyPDF2
-    print("PyPDF2 found")
-except ImportError:
-    print("PyPDF2 not found")
+for name in BACKENDS:
+    if is_available(name):
+        print(f"{name} found ({backend_version(name)})")
+    else:
+        print(f"{name} not found")
+
+# Optionally time the installed ones: python check_pdf_libs.py booklet.pdf [reference.txt]
+if len(sys.argv) > 1:
+    best, results = calibrate(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    for name, result in results.items():
+        if "error" in result:
+            print(f"  {name}: {result['error']}")
+        else:
+            print(f"  {name}: {result['seconds']:.3f}s, quality {result['quality']:.3f}")
+    print(f"Fastest acceptable backend: {best}")
@@ -0,0 +1,322 @@
+import argparse
+import contextlib
+import io
+import re
+from collections import Counter
+
+import instrument
+import parse_questions
+import parse_questions_v2
+import parse_questions_v3
+from answer_key import read_answer_table
+from parse_questions_v3 import LETTERS, split_options
+from pipeline import write_json_atomic
+
+# Runs every parser generation on the same dump, each in its own worker
+# process, and merges their output question by question, aligned on
+# (test id, question id) in v3's numbering (the parsers split the booklet
+# into tests differently, so tests and questions are matched on their text):
+#
+#   text       the version most parsers agree on, ties going to the newer one
+#   options    likewise, among the versions with room for the key's letter
+#   answer     the answer key's letter when it fits, else the answer most
+#              parsers agree on
+#
+# Questions are aligned on content, text first, then options, in the
+# numbering of the first parser; two of its questions are never merged.
+# A question a parser mangled (options glued together, more than four)
+# gets no option or answer vote from that parser.
+#
+# Every question gets a confidence between 0 and 1: the weakest of the
+# text, option and answer agreement, each scaled by the share of witnesses
+# that found the question at all, the parsers plus the answer key when its
+# letter fits the options. Questions below REVIEW_BELOW are listed for a
+# hand check instead of editing the whole JSON.
+#
+#   python consensus_parse.py [pdf_content.txt] [-o consensus_questions.json]
+
+OUTPUT_PATH = 'consensus_questions.json'
+
+# A question below this confidence is listed for review: one the parsers
+# read differently, or whose answer nothing confirms. Read by v3 alone and
+# matched by the answer key is 0.5 and passes; on pdf_content.txt that
+# leaves 30 of 192 questions to check
+REVIEW_BELOW = 0.5
+
+# Answers decided by vote alone count for at most this much
+UNKEYED_WEIGHT = 0.5
+
+OPTION_LABEL_RE = re.compile(r'^[A-D]\s?\)\s*')
+# A label left inside an option after stripping its own: two options glued
+GLUED_LABEL_RE = re.compile(r'(^|\s)[A-D]\)')
+
+
+def parse_v1(path):
+    return parse_questions.parse_pdf_content(path)
+
+
+def parse_v2(path):
+    return parse_questions_v2.parse_tests(path)
+
+
+def parse_v3(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_questions_v3.parse_lines(f)
+
+
+# Newest first: ties go to the earlier entry
+STRATEGIES = {
+    "v3": parse_v3,
+    "v2": parse_v2,
+    "v1": parse_v1,
+}
+
+
+def _run_strategy(job):
+    # Runs in a worker process; the older parsers print progress
+    name, path = job
+    with contextlib.redirect_stdout(io.StringIO()):
+        return name, STRATEGIES[name](path)
+
+
+def run_strategies(path, strategies=STRATEGIES, workers=None):
+    jobs = [(name, path) for name in strategies]
+    if workers == 1:
+        return dict(map(_run_strategy, jobs))
+    # Imported here so "consensus --help" stays quick
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers or len(jobs)) as pool:
+        return dict(pool.map(_run_strategy, jobs))
+
+
+def normalize(text):
+    return " ".join(str(text).split())
+
+
+def normalize_options(options):
+    # v1 and v2 keep the "A) " labels, v3 strips them. The older parsers
+    # also glue options together when several share a line ("A) I - II
+    # B) II - I"); they are split again on their labels so they can be
+    # compared with v3's
+    options = [normalize(str(option)) for option in options]
+    split, letters, _ = split_options(options)
+    if letters:
+        options = split
+    return tuple(normalize(OPTION_LABEL_RE.sub("", option)) for option in options)
+
+
+def well_formed(q):
+    # Older parsers glue options together, or the next question into the
+    # options, when they miss a label; such a question does not get a vote.
+    # Picture questions have empty options, matching items none at all
+    options = normalize_options(q['options'])
+    return (bool(normalize(q['text'])) and len(options) <= len(LETTERS)
+            and not any(GLUED_LABEL_RE.search(option) for option in options))
+
+
+def test_content(test):
+    return {normalize(q['text']) for q in test['questions']} | {
+        option for q in test['questions'] for option in normalize_options(q['options'])}
+
+
+def match_tests(reference, tests):
+    # {test id: reference test id}. The parsers split the booklet into tests
+    # differently, so ids are matched on shared question and option text;
+    # a test sharing nothing keeps its own id if that is free
+    reference_content = {t['id']: test_content(t) for t in reference}
+    mapping = {}
+    for test in tests:
+        content = test_content(test)
+        best = max(reference_content, key=lambda ref: len(content & reference_content[ref]), default=None)
+        if best is not None and content & reference_content[best]:
+            mapping[test['id']] = best
+        elif test['id'] not in reference_content:
+            mapping[test['id']] = test['id']
+    return mapping
+
+
+def content_index(reference):
+    # {normalized text or options: [key]}, in reference order
+    index = {}
+    for test in reference:
+        for q in test['questions']:
+            key = (test['id'], q['id'])
+            text = normalize(q['text'])
+            if text:
+                index.setdefault(text, []).append(key)
+            options = normalize_options(q['options'])
+            if any(options):
+                index.setdefault(options, []).append(key)
+    return index
+
+
+def align(outputs):
+    # {(test id, question id): {strategy: question}} in the numbering of the
+    # first strategy, each of whose questions keeps its own key. Another
+    # strategy's question goes to the reference question with the same text,
+    # else the same options, preferring the matched test. A key takes one
+    # question per strategy, so a repeated text is matched to the next
+    # reference question with it, and two reference questions are never
+    # merged into one. A well-formed question that matches nothing goes by
+    # its own id in the matched test, if that is still free; a mangled one
+    # only by its text
+    names = list(outputs)
+    reference = outputs[names[0]]
+    aligned = {}
+    for test in reference:
+        for q in test['questions']:
+            key = (test['id'], q['id'])
+            if key in aligned:
+                instrument.log(instrument.INFO, f"  Test {key[0]} Q{key[1]} appears twice in {names[0]}, "
+                               f"keeping the first")
+                continue
+            aligned[key] = {names[0]: q}
+
+    index = content_index(reference)
+    for name in names[1:]:
+        tests = outputs[name]
+        mapping = match_tests(reference, tests)
+        for test in tests:
+            test_id = mapping.get(test['id'])
+            for q in test['questions']:
+                usable = well_formed(q)
+                text = normalize(q['text'])
+                keys = index.get(text, []) if text else []
+                if not keys and usable:
+                    keys = index.get(normalize_options(q['options']), [])
+                free = [k for k in keys if name not in aligned[k]]
+                key = next((k for k in free if k[0] == test_id), free[0] if free else None)
+                if key is None and not keys and usable and test_id is not None:
+                    key = (test_id, q['id'])
+                    if name in aligned.get(key, {}):
+                        key = None
+                if key is not None:
+                    aligned.setdefault(key, {})[name] = q
+    return aligned
+
+
+def vote(values, order):
+    # values: {strategy: value}. Returns (winning strategy, share of the
+    # voters that agree with it)
+    counts = Counter(values.values())
+    best = max(counts.values())
+    for name in order:
+        if name in values and counts[values[name]] == best:
+            return name, best / len(values)
+
+
+def merge_question(q_id, found, strategies, key_letter):
+    order = [name for name in strategies if name in found]
+    # The winner's own text, so spacing the cleanup step relies on is kept
+    text_from, text_share = vote({name: normalize(q['text']) for name, q in found.items()}, order)
+    text = found[text_from]['text']
+    # Options that have room for the key's letter outvote ones that don't.
+    # A parser that mangled the question found it, but gets no vote here
+    usable = {name: q for name, q in found.items() if well_formed(q)} or found
+    option_votes = {name: normalize_options(q['options']) for name, q in usable.items()}
+    if key_letter is not None:
+        option_votes = {name: options for name, options in option_votes.items()
+                        if LETTERS.index(key_letter) < len(options)} or option_votes
+    options_from, options_share = vote(option_votes, order)
+    options = option_votes[options_from]
+
+    # Answers as option text, so parsers with differently ordered or
+    # labelled options still agree
+    answers = {}
+    for name, q in usable.items():
+        index = q.get('correctAnswer', -1)
+        own_options = normalize_options(q['options'])
+        if 0 <= index < len(own_options):
+            answers[name] = own_options[index]
+
+    answer = -1
+    keyed = key_letter is not None and LETTERS.index(key_letter) < len(options)
+    # The answer key is one more witness that the question is there, and
+    # that it has room for its letter. Options only count the parsers that
+    # could read them: a mangled question neither confirms nor contradicts
+    presence = (len(found) + keyed) / (len(strategies) + 1)
+    option_presence = (len(option_votes) + keyed) / (len(strategies) + 1)
+    if keyed:
+        answer = LETTERS.index(key_letter)
+        # A parser that read a different answer counts against the key
+        answer_score = sum(a == options[answer] for a in answers.values()) / len(answers) if answers else 1.0
+    elif answers:
+        chosen, share = vote(answers, order)
+        answer = options.index(answers[chosen]) if answers[chosen] in options else -1
+        answer_score = UNKEYED_WEIGHT * share if answer != -1 else 0.0
+    else:
+        answer_score = 0.0
+
+    agreement = {
+        "text": round(presence * text_share, 3),
+        "options": round(option_presence * options_share, 3),
+        "answer": round(presence * answer_score, 3),
+    }
+    return {
+        "id": q_id,
+        "text": text,
+        "options": list(options),
+        "userAnswer": None,
+        "correctAnswer": answer,
+        "confidence": min(agreement.values()),
+        "agreement": agreement,
+        "parsers": order
+    }
+
+
+def consensus(outputs, key_table, strategies=STRATEGIES):
+    aligned = align(outputs)
+    tests = {}
+    for (test_id, q_id), found in sorted(aligned.items()):
+        question = merge_question(q_id, found, list(strategies), key_table.letter(test_id, q_id))
+        tests.setdefault(test_id, []).append(question)
+    return [{"id": test_id, "title": f"Test {test_id}", "questions": questions} for test_id, questions in tests.items()]
+
+
+def consensus_parse(input_path, workers=None):
+    with instrument.stage("parse"):
+        outputs = run_strategies(input_path, workers=workers)
+    for name, tests in outputs.items():
+        instrument.count(f"questions_{name}", sum(len(t['questions']) for t in tests))
+    with instrument.stage("merge"):
+        return consensus(outputs, read_answer_table(input_path))
+
+
+def review_list(tests, threshold=REVIEW_BELOW):
+    return [(t['id'], q) for t in tests for q in t['questions'] if q['confidence'] < threshold]
+
+
+def add_arguments(parser):
+    # Shared with engquest_ingest.py's consensus subcommand
+    parser.add_argument("input", nargs="?", default='pdf_content.txt')
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="worker processes (1 = serial, 0 = one per parser)")
+    parser.add_argument("--review-below", type=float, default=REVIEW_BELOW,
+                        help="list questions with a lower confidence")
+    instrument.add_arguments(parser)
+
+
+def main(args):
+    instrument.configure(args.verbosity, args.profile)
+    with instrument.profiled():
+        tests = consensus_parse(args.input, args.workers or None)
+        write_json_atomic(args.output, {"tests": tests})
+
+    review = review_list(tests, args.review_below)
+    for test_id, q in review:
+        agreement = ", ".join(f"{field} {share:.2f}" for field, share in q['agreement'].items())
+        instrument.log(instrument.INFO, f"  Review Test {test_id} Q{q['id']}: confidence {q['confidence']:.2f} "
+                       f"({agreement}; found by {', '.join(q['parsers'])})")
+    total = sum(len(t['questions']) for t in tests)
+    keyed = sum(1 for t in tests for q in t['questions'] if q['correctAnswer'] != -1)
+    instrument.log(instrument.INFO, f"Merged {total} questions in {len(tests)} tests ({keyed} answered, "
+                   f"{len(review)} to review) -> {args.output}")
+    if args.report:
+        instrument.write_report(args.report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse with every parser generation and merge them by consensus.")
+    add_arguments(parser)
+    main(parser.parse_args())
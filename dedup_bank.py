@@ -0,0 +1,257 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import unicodedata
+
+try:
+    import numpy as np
+except ImportError:
+    # Pure Python signatures: same results, much slower on large banks
+    np = None
+
+import instrument
+from pipeline import write_json_atomic
+
+# Merge the questions of many booklets (batch_ingest.py output, or any
+# screening_questions.json-style file) into one bank without duplicates.
+#
+# Exact duplicates are found by hashing the normalized text and options.
+# Near duplicates (OCR noise, a changed word between years) are found with
+# MinHash signatures over character shingles, bucketed by LSH bands: only
+# questions that share a bucket are compared, so the work grows with the
+# number of questions, not with the number of pairs. Candidates are then
+# confirmed with the exact shingle Jaccard similarity, and must also have
+# the same options and stems that share most of their words: grammar items
+# that differ only in the tested word ("I - - - - football." / "He - - - -
+# football.") are near in shingles but are different questions. OCR noise
+# in the options therefore keeps two copies apart, which costs a duplicate
+# rather than a wrong merge.
+#
+#   python dedup_bank.py src/data/booklets -o src/data/question_bank.json
+
+OUTPUT_PATH = 'src/data/question_bank.json'
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16          # 16 bands x 4 rows: pairs above ~0.5 similarity usually share a bucket
+THRESHOLD = 0.7     # Jaccard similarity of the shingle sets to count as duplicates
+
+# Hash arithmetic stays below 2**63, so it fits numpy's uint64
+PRIME = (1 << 31) - 1
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+DASHES_RE = re.compile(r'(?:-\s*){2,}')
+
+
+def normalize(text):
+    # Case, Unicode forms, punctuation and spacing don't matter;
+    # "- - - -" blanks of any length are one blank
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = DASHES_RE.sub(' _ ', text)
+    text = PUNCTUATION_RE.sub(' ', text)
+    return " ".join(text.split())
+
+
+def question_parts(q):
+    return normalize(q['text']), [normalize(o) for o in q['options']]
+
+
+def question_text(parts):
+    stem, options = parts
+    return " | ".join([stem] + options)
+
+
+def exact_key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def shingle_hashes(shingle_set):
+    return [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+            for s in shingle_set]
+
+
+def permutations(seed=1):
+    # (a, b) pairs for the hash family h(x) = (a * x + b) mod PRIME
+    rng = random.Random(seed)
+    return [(rng.randrange(1, PRIME), rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+
+
+class MinHasher:
+    def __init__(self, seed=1):
+        self.perms = permutations(seed)
+        if np is not None:
+            self.a = np.array([a for a, _ in self.perms], dtype=np.uint64)[:, None]
+            self.b = np.array([b for _, b in self.perms], dtype=np.uint64)[:, None]
+
+    def signature(self, hashes):
+        if np is not None:
+            x = np.array(hashes, dtype=np.uint64) % PRIME
+            return tuple((((self.a * x) + self.b) % PRIME).min(axis=1).tolist())
+        x = [h % PRIME for h in hashes]
+        return tuple(min((a * v + b) % PRIME for v in x) for a, b in self.perms)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def load_questions(paths):
+    # Every question with where it came from: (booklet, test id, question id)
+    questions = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            tests = json.load(f).get('tests', [])
+        source = os.path.basename(path)
+        for test in tests:
+            for q in test['questions']:
+                questions.append((q, {"booklet": source, "test": test['id'], "question": q['id']}))
+    return questions
+
+
+def same_question(a, b, threshold=THRESHOLD):
+    # A candidate pair that is near in shingles: same option set, and
+    # stems whose words mostly match
+    (stem_a, options_a), (stem_b, options_b) = a, b
+    return sorted(options_a) == sorted(options_b) and jaccard(set(stem_a.split()), set(stem_b.split())) >= threshold
+
+
+def find_duplicates(parts, threshold=THRESHOLD):
+    # Returns a cluster id (index of the first member) for every
+    # (normalized stem, normalized options)
+    texts = [question_text(p) for p in parts]
+    uf = UnionFind(len(texts))
+
+    # Exact duplicates first; only one of each goes through MinHash
+    by_key = {}
+    representatives = []
+    for i, text in enumerate(texts):
+        first = by_key.setdefault(exact_key(text), i)
+        if first == i:
+            representatives.append(i)
+        else:
+            uf.union(first, i)
+    instrument.count("exact_duplicates", len(texts) - len(representatives))
+
+    hasher = MinHasher()
+    rows = NUM_PERM // BANDS
+    buckets = {}
+    shingle_sets = {}
+    with instrument.stage("minhash"):
+        for i in representatives:
+            shingle_sets[i] = shingles(texts[i])
+            signature = hasher.signature(shingle_hashes(shingle_sets[i]))
+            for band in range(BANDS):
+                buckets.setdefault((band, signature[band * rows:(band + 1) * rows]), []).append(i)
+
+    checked = set()
+    near = 0
+    with instrument.stage("verify"):
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    if (uf.find(i) != uf.find(j) and jaccard(shingle_sets[i], shingle_sets[j]) >= threshold
+                            and same_question(parts[i], parts[j], threshold)):
+                        uf.union(i, j)
+                        near += 1
+    instrument.count("candidate_pairs", len(checked))
+    instrument.count("near_duplicates", near)
+    return [uf.find(i) for i in range(len(texts))]
+
+
+def canonical(members):
+    # Prefer a keyed question with four options, then the longest text;
+    # ties go to the first booklet it appeared in
+    best = max(enumerate(members), key=lambda item: (item[1][0].get('correctAnswer', -1) != -1,
+                                                     len(item[1][0]['options']) == 4,
+                                                     len(item[1][0]['text']), -item[0]))
+    return best[1]
+
+
+def merge_bank(questions, threshold=THRESHOLD):
+    with instrument.stage("normalize"):
+        parts = [question_parts(q) for q, _ in questions]
+    clusters = {}
+    for i, root in enumerate(find_duplicates(parts, threshold)):
+        clusters.setdefault(root, []).append(questions[i])
+
+    bank = []
+    for bank_id, root in enumerate(sorted(clusters), 1):
+        members = clusters[root]
+        q, _ = canonical(members)
+        answers = {normalize(m['options'][m['correctAnswer']])
+                   for m, _ in members if 0 <= m.get('correctAnswer', -1) < len(m['options'])}
+        entry = {
+            "id": bank_id,
+            "text": q['text'],
+            "options": q['options'],
+            "correctAnswer": q.get('correctAnswer', -1),
+            "sources": [source for _, source in members]
+        }
+        if len(answers) > 1:
+            # Copies disagree on the answer; needs a human look
+            entry['answerConflict'] = True
+        bank.append(entry)
+    return bank
+
+
+def input_files(inputs):
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            paths += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                      if name.endswith('.json') and name != 'index.json']
+        else:
+            paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge booklet question banks, removing near-duplicate questions.")
+    parser.add_argument("inputs", nargs="+", help="booklet JSON files or folders of them")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="shingle Jaccard similarity that counts as a duplicate")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+
+    instrument.configure(args.verbosity, args.profile)
+    paths = input_files(args.inputs)
+    with instrument.profiled():
+        questions = load_questions(paths)
+        bank = merge_bank(questions, args.threshold)
+        with instrument.stage("json_dump"):
+            write_json_atomic(args.output, {"questions": bank})
+
+    conflicts = sum(1 for q in bank if q.get('answerConflict'))
+    instrument.log(instrument.INFO, f"Merged {len(questions)} questions from {len(paths)} booklets into "
+                   f"{len(bank)} unique questions ({conflicts} with conflicting answers) -> {args.output}")
+    if args.report:
+        instrument.write_report(args.report)
@@ -0,0 +1,147 @@
+import argparse
+import sys
+
+# One command for the ingestion scripts, so the USB-prep batch files call
+# a single entry point:
+#
+#   python engquest_ingest.py extract [booklet.pdf] [-o pdf_content.txt]
+#   python engquest_ingest.py parse   [pdf_content.txt] [-o screening_questions.json]
+#   python engquest_ingest.py consensus [pdf_content.txt] [-o consensus_questions.json]
+#   python engquest_ingest.py clean   [screening_questions.json]
+#   python engquest_ingest.py check   [screening_questions.json] [--dump pdf_content.txt]   # exits 1 on schema errors
+#   python engquest_ingest.py export  [-o public/data]
+#   python engquest_ingest.py audio   [-o public/audio] [-b espeak-ng]
+#
+# The batch files run these in loops, so startup matters: only argparse
+# loads up front. A subcommand that wraps a script takes its options from
+# that script's add_arguments(), so only the chosen subcommand's script is
+# imported; pypdf, numpy and multiprocessing load only once a subcommand
+# runs, and so do subprocess, thread pools, hashlib and tempfile inside
+# the scripts. bench_startup.py holds startup to STARTUP_BUDGET_MS.
+
+SCREENING_PATH = 'src/data/screening_questions.json'
+CURRICULUM_PATH = 'src/data/english_curriculum.json'
+
+# Milliseconds on top of a bare interpreter start for "<subcommand> --help"
+STARTUP_BUDGET_MS = 50
+
+
+def extract_command():
+    from extract_pdf_to_file import add_arguments, main
+    return add_arguments, main
+
+
+def parse_command():
+    from parse_questions_v3 import add_arguments, main
+    return add_arguments, main
+
+
+def consensus_command():
+    from consensus_parse import add_arguments, main
+    return add_arguments, main
+
+
+def add_clean_arguments(parser):
+    parser.add_argument("input", nargs="?", default=SCREENING_PATH)
+    parser.add_argument("-o", "--output", help="default: overwrite the input")
+
+
+def run_clean(args):
+    import json
+
+    from cleanup_json_v2 import clean_tests
+    from pipeline import write_json_atomic
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        tests = json.load(f)['tests']
+    before = sum(len(t['questions']) for t in tests)
+    cleaned = list(clean_tests(tests))
+    after = sum(len(t['questions']) for t in cleaned)
+    write_json_atomic(args.output or args.input, {"tests": cleaned})
+    print(f"{len(cleaned)} tests remain, {before - after} questions without options removed")
+
+
+def clean_command():
+    return add_clean_arguments, run_clean
+
+
+def add_check_arguments(parser):
+    parser.add_argument("input", nargs="?", default=SCREENING_PATH)
+    parser.add_argument("--curriculum", default=CURRICULUM_PATH)
+    parser.add_argument("--dump", metavar="DUMP", help="text dump whose answer key to check against the tests")
+    parser.add_argument("--limit", type=int, default=50, help="validation issues to print (0 = all)")
+
+
+def run_check(args):
+    import json
+
+    from check_json import new_summary, print_summary, validate_tests
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        tests = json.load(f)['tests']
+    summary = new_summary()
+    for _ in validate_tests(tests, summary):
+        pass
+    print_summary(summary)
+
+    if args.dump:
+        from answer_key import describe_issues, read_answer_table
+        for message in describe_issues(read_answer_table(args.dump).check(dict(summary['tests']))):
+            print(f"  Key check: {message}")
+
+    from validate_banks import describe_checks, error_count, validate_banks
+    checks = validate_banks(tests, curriculum_path=args.curriculum)
+    for message in describe_checks(checks, args.limit):
+        print(f"  {message}")
+    return 1 if error_count(checks) else 0
+
+
+def check_command():
+    return add_check_arguments, run_check
+
+
+def export_command():
+    from export_bank import add_arguments, main
+    return add_arguments, main
+
+
+def audio_command():
+    from build_audio import add_arguments, main
+    return add_arguments, main
+
+
+COMMANDS = {
+    "extract": ("extract PDF text to a dump, one page at a time", extract_command),
+    "parse": ("parse the screening tests from a text dump", parse_command),
+    "consensus": ("parse with every parser generation and score each question", consensus_command),
+    "clean": ("drop questions without options and tests left empty", clean_command),
+    "check": ("count questions and answers and validate both banks", check_command),
+    "export": ("write the sharded game bundle", export_command),
+    "audio": ("render the flashcard audio strings to cached speech files", audio_command),
+}
+
+
+def build_parser(command=None):
+    # Every subcommand is listed, but only the given one gets its options
+    parser = argparse.ArgumentParser(prog="engquest-ingest", description="Booklet ingestion tools for EngQuest.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+    for name, (help_text, load) in COMMANDS.items():
+        subparser = commands.add_parser(name, help=help_text, description=help_text)
+        if name == command:
+            add_arguments, run = load()
+            add_arguments(subparser)
+            subparser.set_defaults(run=run)
+    return parser
+
+
+def parse_args(argv=None):
+    # There are no options before the subcommand besides --help, so the
+    # subcommand is the first argument that isn't an option
+    argv = sys.argv[1:] if argv is None else argv
+    command = next((arg for arg in argv if not arg.startswith('-')), None)
+    return build_parser(command).parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(args.run(args) or 0)
@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import sys
+
+import instrument
+from pipeline import write_json_atomic
+from validate_banks import ERROR, describe_checks, error_count, validate_banks
+
+# Compact, sharded copy of the question banks for the game: one minified
+# file per screening test and per curriculum unit, plus a small manifest.
+# Files go under public/ so the app can fetch only the test or unit being
+# played instead of bundling both banks into every route. Both banks go
+# through validate_banks.py first; any error stops the export.
+#
+#   python export_bank.py [-o public/data]
+
+SCREENING_PATH = 'src/data/screening_questions.json'
+CURRICULUM_PATH = 'src/data/english_curriculum.json'
+EXPORT_DIR = 'public/data'
+MANIFEST_NAME = 'manifest.json'
+
+# Per-unit content that only the unit pages need; everything else in a
+# unit is small and goes into the manifest for the world map
+UNIT_CONTENT_KEYS = ('flashcards', 'sentenceBuilder', 'bossQuiz', 'topicSummary', 'readingQuestions')
+
+# Validation errors printed when the export is refused
+VALIDATION_LIMIT = 20
+
+
+def write_shard(export_dir, rel_path, data):
+    path = os.path.join(export_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json_atomic(path, data, indent=None)
+    import hashlib
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return {"file": rel_path.replace(os.sep, '/'), "bytes": len(raw), "hash": hashlib.sha1(raw).hexdigest()[:12]}
+
+
+def remove_stale(export_dir, subdir, keep):
+    directory = os.path.join(export_dir, subdir)
+    for name in os.listdir(directory):
+        if name.endswith('.json') and name not in keep:
+            os.remove(os.path.join(directory, name))
+
+
+def export_screening(tests, export_dir):
+    entries = []
+    for test in tests:
+        name = f"test-{test['id']}.json"
+        shard = write_shard(export_dir, os.path.join('screening', name), test)
+        entries.append({"id": test['id'], "title": test['title'], "questions": len(test['questions']), **shard})
+    if entries:
+        remove_stale(export_dir, 'screening', {os.path.basename(e['file']) for e in entries})
+    return entries
+
+
+def export_curriculum(curriculum, export_dir):
+    entries = []
+    for unit in curriculum['units']:
+        name = f"unit-{unit['id']}.json"
+        content = {key: unit[key] for key in UNIT_CONTENT_KEYS if key in unit}
+        content['id'] = unit['id']
+        shard = write_shard(export_dir, os.path.join('units', name), content)
+        meta = {key: value for key, value in unit.items() if key not in UNIT_CONTENT_KEYS}
+        entries.append({**meta, **shard})
+    if entries:
+        remove_stale(export_dir, 'units', {os.path.basename(e['file']) for e in entries})
+    return entries
+
+
+def export_bank(tests=None, export_dir=EXPORT_DIR, screening_path=SCREENING_PATH, curriculum_path=CURRICULUM_PATH,
+                validate=True):
+    if tests is None:
+        with open(screening_path, 'r', encoding='utf-8') as f:
+            tests = json.load(f)['tests']
+    with open(curriculum_path, 'r', encoding='utf-8') as f:
+        curriculum = json.load(f)
+
+    if validate:
+        # Nothing is written while either bank has errors
+        with instrument.stage("validate"):
+            checks = validate_banks(tests, curriculum)
+        for message in describe_checks(checks, VALIDATION_LIMIT, ERROR):
+            print(f"  {message}")
+        errors = error_count(checks)
+        if errors:
+            raise ValueError(f"{errors} errors in the question banks, nothing exported")
+
+    manifest = {
+        "screening": export_screening(tests, export_dir),
+        "units": export_curriculum(curriculum, export_dir),
+        "shopItems": curriculum.get('shopItems', [])
+    }
+    write_json_atomic(os.path.join(export_dir, MANIFEST_NAME), manifest, indent=None)
+
+    total = sum(e['bytes'] for e in manifest['screening'] + manifest['units'])
+    instrument.log(instrument.INFO, f"Exported {len(manifest['screening'])} tests and {len(manifest['units'])} units "
+          f"({total} bytes of shards) to {export_dir}")
+    return manifest
+
+
+def add_arguments(parser):
+    # Shared with engquest_ingest.py's export subcommand
+    parser.add_argument("-o", "--output-dir", default=EXPORT_DIR)
+    parser.add_argument("--no-validate", action="store_true", help="export even if the banks have schema errors")
+
+
+def main(args):
+    try:
+        export_bank(export_dir=args.output_dir, validate=not args.no_validate)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the question banks as minified per-test/per-unit shards.")
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
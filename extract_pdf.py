@@ -1,16 +1,17 @@
-import pypdf
-import json
+import sys
+
+from extract_pdf_to_file import format_page, iter_page_texts
+from pdf_backends import choose_backend, open_document
 
 pdf_path = "5.sınıf ingilizce tarama.pdf"
 
 try:
-    reader = pypdf.PdfReader(pdf_path)
-    text_content = ""
-    for page in reader.pages:
-        text_content += page.extract_text() + "\n"
-    
+    document = open_document(pdf_path, choose_backend("auto", pdf_path))
+
     print("EXTRACTED_CONTENT_START")
-    print(text_content)
+    for page_num, text in iter_page_texts(document):
+        sys.stdout.write(format_page(page_num, text))
     print("EXTRACTED_CONTENT_END")
+    document.close()
 except Exception as e:
     print(f"Error: {e}")
@@ -1,19 +1,202 @@
-import pypdf
-import json
+import argparse
+import os
+import sys
+
+from page_cache import CACHE_DIR, MAX_BYTES, PageCache, file_digest
+from pdf_backends import BACKENDS, DEFAULT_BACKEND, backend_version, choose_backend, load_calibration, open_document
 
 pdf_path = "5.sınıf ingilizce tarama.pdf"
 output_path = "pdf_content.txt"
 
-try:
-    reader = pypdf.PdfReader(pdf_path)
-    text_content = ""
-    for page in reader.pages:
-        text_content += page.extract_text() + "\n"
-    
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(text_content)
-        
-    print(f"Successfully wrote content to {output_path}")
-
-except Exception as e:
-    print(f"Error: {e}")
+# Written before every page so downstream parsers can tell pages apart
+PAGE_MARKER = "=== PAGE {} ==="
+
+# Each worker gets several small ranges so slow pages don't leave cores idle
+CHUNKS_PER_WORKER = 4
+
+
+def iter_page_texts(document):
+    # Yield pages one at a time instead of building one big string,
+    # so memory stays flat no matter how long the booklet is.
+    for index in range(document.page_count):
+        yield index + 1, document.page_text(index)
+
+
+def extract_cached_page(document, index, cache):
+    # Hashing the raw content stream and resources is much cheaper than
+    # extracting text
+    key = cache.page_key(document.page_digest(index), index)
+    text = cache.get(key)
+    if text is None:
+        text = document.page_text(index)
+        cache.put(key, text)
+    return key, text
+
+
+def iter_cached_page_texts(pdf_path, cache, backend=DEFAULT_BACKEND):
+    # Like iter_page_texts, but only decodes pages missing from the cache.
+    # An unchanged PDF is served from its manifest without opening it.
+    pdf_digest = file_digest(pdf_path)
+    keys = cache.get_manifest(pdf_digest)
+    document = None
+
+    try:
+        if keys is not None:
+            for index, key in enumerate(keys):
+                text = cache.get(key)
+                if text is None:
+                    # Evicted since the manifest was checked
+                    document = document or open_document(pdf_path, backend)
+                    key, text = extract_cached_page(document, index, cache)
+                yield index + 1, text
+            return
+
+        document = open_document(pdf_path, backend)
+        keys = []
+        for index in range(document.page_count):
+            key, text = extract_cached_page(document, index, cache)
+            keys.append(key)
+            yield index + 1, text
+        cache.put_manifest(pdf_digest, keys)
+    finally:
+        if document is not None:
+            document.close()
+
+
+def format_page(page_num, text):
+    return PAGE_MARKER.format(page_num) + "\n" + text + "\n"
+
+
+def extract_to_file(pdf_path, output_path, cache=None, backend=DEFAULT_BACKEND):
+    document = None
+    if cache is None:
+        document = open_document(pdf_path, backend)
+        pages = iter_page_texts(document)
+    else:
+        pages = iter_cached_page_texts(pdf_path, cache, backend)
+
+    page_count = 0
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for page_num, text in pages:
+                f.write(format_page(page_num, text))
+                page_count += 1
+    finally:
+        if document is not None:
+            document.close()
+    return page_count
+
+
+def page_ranges(page_count, workers):
+    chunk = max(1, -(-page_count // (workers * CHUNKS_PER_WORKER)))
+    return [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+
+def _extract_range(job):
+    # Runs in a worker process: every worker opens its own document,
+    # parsed PDFs can't be shared across processes.
+    pdf_path, start, stop, cache_dir, backend = job
+    document = open_document(pdf_path, backend)
+    try:
+        if cache_dir is None:
+            return [format_page(i + 1, document.page_text(i)) for i in range(start, stop)], [], (0, 0)
+
+        cache = PageCache(cache_dir, extractor_version=backend_version(backend))
+        chunk, keys = [], []
+        for i in range(start, stop):
+            key, text = extract_cached_page(document, i, cache)
+            chunk.append(format_page(i + 1, text))
+            keys.append(key)
+        return chunk, keys, (cache.hits, cache.misses)
+    finally:
+        document.close()
+
+
+def extract_to_file_parallel(pdf_path, output_path, workers=None, cache=None, backend=DEFAULT_BACKEND):
+    if cache is not None:
+        pdf_digest = file_digest(pdf_path)
+        if cache.get_manifest(pdf_digest) is not None:
+            # Nothing to decode, the serial path reads straight from the cache
+            return extract_to_file(pdf_path, output_path, cache, backend)
+
+    # Imported here: multiprocessing costs more to load than the serial
+    # path costs to run on a short booklet
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    document = open_document(pdf_path, backend)
+    page_count = document.page_count
+    document.close()
+    cache_dir = cache.directory if cache is not None else None
+    jobs = [(pdf_path, start, stop, cache_dir, backend) for start, stop in page_ranges(page_count, workers)]
+
+    # pool.map returns results in submission order, so the output keeps
+    # the original page order and matches the serial path byte for byte.
+    keys = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for chunk, chunk_keys, (hits, misses) in pool.map(_extract_range, jobs):
+                f.writelines(chunk)
+                keys.extend(chunk_keys)
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+
+    if cache is not None:
+        cache.put_manifest(pdf_digest, keys)
+    return page_count
+
+
+def add_arguments(parser):
+    # Shared with engquest_ingest.py's extract subcommand
+    parser.add_argument("pdf", nargs="?", default=pdf_path)
+    parser.add_argument("-o", "--output", default=output_path)
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes (1 = serial, 0 = one per CPU core)")
+    parser.add_argument("--no-cache", action="store_true", help="decode every page, ignore the page cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--cache-size", type=int, default=MAX_BYTES // (1024 * 1024), metavar="MB",
+                        help="evict least recently used pages above this size")
+    parser.add_argument("-b", "--backend", default="auto", choices=["auto", *BACKENDS],
+                        help="PDF library to extract with (auto = fastest acceptable, from calibration)")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="re-time the installed backends on this PDF before choosing")
+    parser.add_argument("--reference", metavar="DUMP",
+                        help="with --calibrate: known-good text dump to score backends against")
+
+
+def main(args):
+    try:
+        backend = choose_backend(args.backend, args.pdf, args.calibrate, args.reference)
+        calibration = load_calibration() if args.calibrate and args.backend == "auto" else None
+        if calibration:
+            for name, result in calibration["results"].items():
+                if "error" in result:
+                    print(f"  {name}: {result['error']}")
+                else:
+                    print(f"  {name}: {result['seconds']:.3f}s, quality {result['quality']:.3f}")
+        print(f"Using backend {backend}")
+
+        cache = None
+        if not args.no_cache:
+            cache = PageCache(args.cache_dir, args.cache_size * 1024 * 1024, backend_version(backend))
+
+        if args.workers == 1:
+            page_count = extract_to_file(args.pdf, args.output, cache, backend)
+        else:
+            page_count = extract_to_file_parallel(args.pdf, args.output, args.workers or None, cache, backend)
+        print(f"Successfully wrote {page_count} pages to {args.output}")
+        if cache is not None:
+            evicted = cache.evict()
+            print(f"Page cache: {cache.hits} hits, {cache.misses} misses, {evicted} evicted")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract PDF text to a file, one page at a time.")
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
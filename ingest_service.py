@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from batch_ingest import INDEX_NAME, build_index, ingest_booklet, worker_failure
+from page_cache import file_digest
+from pdf_backends import BACKENDS, choose_backend
+from pipeline import write_json_atomic
+
+# Local ingestion service for teacher-uploaded booklets. Runs offline on the
+# classroom machine: an HTTP API on 127.0.0.1 (standard library only) puts
+# jobs on a queue, a bounded process pool extracts and parses them, and
+# every finished booklet is published to the output folder with index.json
+# updated, where the app picks it up.
+#
+#   python ingest_service.py [-o src/data/booklets] [--port 8765] [-w 2]
+#
+#   POST   /jobs          raw PDF/text body (?name=booklet.pdf), or JSON {"path": "..."}
+#   GET    /jobs          all jobs
+#   GET    /jobs/<id>     one job: queued, running, done, failed or cancelled
+#   DELETE /jobs/<id>     cancel a queued or running job
+#   GET    /bank          the published index.json
+
+HOST = '127.0.0.1'
+PORT = 8765
+OUTPUT_DIR = 'src/data/booklets'
+WORK_DIR = '.ingest_jobs'
+MAX_BODY = 64 * 1024 * 1024
+MAX_QUEUED = 100
+# The only web origin allowed to call the API from a browser: the app's
+# Next.js dev server. Any page could otherwise queue {"path": ...} jobs and
+# read back files from this machine
+ALLOW_ORIGIN = 'http://localhost:3000'
+BOOKLET_EXTENSIONS = ('.pdf', '.txt')
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Job:
+    def __init__(self, source, path, work_root):
+        self.id = uuid.uuid4().hex[:12]
+        self.source = source
+        self.path = path
+        # Upload and unpublished output live here until the job ends
+        self.work_dir = os.path.join(work_root, self.id)
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.record = None
+
+    def to_dict(self):
+        job = {"id": self.id, "source": self.source, "status": self.status, "submitted": round(self.submitted, 3)}
+        if self.started:
+            job['started'] = round(self.started, 3)
+        if self.finished:
+            job['finished'] = round(self.finished, 3)
+        if self.record:
+            job['result'] = self.record
+        return job
+
+
+class IngestService:
+    def __init__(self, output_dir=OUTPUT_DIR, workers=2, backend="pypdf", work_dir=WORK_DIR,
+                 allow_origin=ALLOW_ORIGIN):
+        self.output_dir = output_dir
+        self.allow_origin = allow_origin
+        self.work_dir = work_dir
+        self.backend = backend
+        self.workers = workers
+        self.jobs = {}
+        self.queue = asyncio.Queue(MAX_QUEUED)
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.publish_lock = asyncio.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(work_dir, exist_ok=True)
+
+    # Jobs
+
+    def submit(self, source, path=None, data=None):
+        # Either a path on this machine or the uploaded bytes
+        source = os.path.basename(source)
+        if not source.lower().endswith(BOOKLET_EXTENSIONS):
+            raise HTTPError(400, f"Expected a .pdf or .txt booklet, got {source!r}")
+        if self.queue.full():
+            raise HTTPError(503, "Too many queued jobs, try again later")
+
+        job = Job(source, path, self.work_dir)
+        os.makedirs(job.work_dir)
+        if data is not None:
+            job.path = os.path.join(job.work_dir, source)
+            with open(job.path, 'wb') as f:
+                f.write(data)
+        elif not os.path.isfile(path):
+            shutil.rmtree(job.work_dir)
+            raise HTTPError(404, f"No such file: {path}")
+
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    def get(self, job_id):
+        if job_id not in self.jobs:
+            raise HTTPError(404, f"No job {job_id}")
+        return self.jobs[job_id]
+
+    def cancel(self, job_id):
+        # A queued job is skipped; a running one can't be stopped inside the
+        # worker process, but its result is thrown away instead of published
+        job = self.get(job_id)
+        if job.status not in (QUEUED, RUNNING):
+            raise HTTPError(409, f"Job {job_id} is already {job.status}")
+        job.status = CANCELLED
+        job.finished = time.time()
+        return job
+
+    async def worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.status == CANCELLED:
+                    continue
+                job.status = RUNNING
+                job.started = time.time()
+                record = await self.run_job(loop, job)
+
+                if job.status == CANCELLED:
+                    continue
+                job.record = record
+                if record['status'] == "ok":
+                    await self.publish(job)
+                    job.status = DONE
+                else:
+                    job.status = FAILED
+                job.finished = time.time()
+            except Exception as e:
+                # A job that fails here (e.g. publishing hit a full disk)
+                # must not take the worker down with it
+                job.record = worker_failure(job.path, e)
+                job.status = FAILED
+                job.finished = time.time()
+            finally:
+                shutil.rmtree(job.work_dir, ignore_errors=True)
+                self.queue.task_done()
+
+    async def run_job(self, loop, job):
+        # A worker process that dies breaks the whole pool, failing the jobs
+        # running next to it too: swap in a fresh pool and retry once
+        for _ in range(2):
+            pool = self.pool
+            try:
+                return await loop.run_in_executor(pool, ingest_booklet, job.path, job.work_dir, self.backend)
+            except BrokenProcessPool as e:
+                error = e
+                self.restart_pool(pool)
+            except Exception as e:
+                return worker_failure(job.path, e)
+        return worker_failure(job.path, error)
+
+    def restart_pool(self, broken):
+        # Jobs that failed on the same broken pool restart it only once
+        if self.pool is broken:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            broken.shutdown(wait=False)
+
+    async def publish(self, job):
+        # Move the booklet into the output folder and update the index;
+        # one at a time, so concurrent jobs don't lose each other's entries.
+        # Uploads are told apart by content, not name: two different
+        # booklet.pdf files both stay, the same one uploaded again replaces
+        # its entry
+        digest = await asyncio.to_thread(file_digest, job.path)
+        built = job.record['output']
+        name = f"{os.path.splitext(built)[0]}-{digest[:12]}.json"
+        job.record.update(output=name, digest=digest)
+        async with self.publish_lock:
+            os.replace(os.path.join(job.work_dir, built), os.path.join(self.output_dir, name))
+            index_path = os.path.join(self.output_dir, INDEX_NAME)
+            records = self.read_index().get('booklets', [])
+            records = [r for r in records if r.get('digest') != digest] + [job.record]
+            write_json_atomic(index_path, build_index(records))
+
+    def read_index(self):
+        try:
+            with open(os.path.join(self.output_dir, INDEX_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return build_index([])
+
+    # HTTP
+
+    async def route(self, method, target, headers, body):
+        url = urlsplit(target)
+        parts = [p for p in url.path.split('/') if p]
+
+        if parts == ["jobs"]:
+            if method == "GET":
+                return 200, {"jobs": [job.to_dict() for job in self.jobs.values()]}
+            if method == "POST":
+                if headers.get('content-type', '').startswith('application/json'):
+                    try:
+                        path = json.loads(body)['path']
+                    except (ValueError, KeyError, TypeError):
+                        raise HTTPError(400, 'Expected {"path": "..."}')
+                    return 201, self.submit(path, path=path).to_dict()
+                name = parse_qs(url.query).get('name', [headers.get('x-filename', '')])[0]
+                if not body:
+                    raise HTTPError(400, "Empty upload")
+                return 201, self.submit(name, data=body).to_dict()
+        elif len(parts) == 2 and parts[0] == "jobs":
+            if method == "GET":
+                return 200, self.get(parts[1]).to_dict()
+            if method == "DELETE":
+                return 200, self.cancel(parts[1]).to_dict()
+        elif parts == ["bank"]:
+            if method == "GET":
+                return 200, self.read_index()
+        else:
+            raise HTTPError(404, f"Unknown path {url.path}")
+        raise HTTPError(405, f"{method} not allowed on {url.path}")
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                request_line = (await reader.readline()).decode('latin-1')
+                method, target, _ = request_line.split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    raise HTTPError(413, f"Uploads are limited to {MAX_BODY // (1024 * 1024)} MB")
+                body = await reader.readexactly(length) if length else b""
+
+                if method == "OPTIONS":
+                    status, payload = 204, None
+                else:
+                    status, payload = await self.route(method, target, headers, body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (ValueError, asyncio.IncompleteReadError):
+                status, payload = 400, {"error": "Malformed request"}
+
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b""
+            # CORS headers, so the app's dev server (and only it) can call
+            # the service directly
+            cors = ""
+            if self.allow_origin:
+                cors = (f"Access-Control-Allow-Origin: {self.allow_origin}\r\n"
+                        f"Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS\r\n"
+                        f"Access-Control-Allow-Headers: Content-Type, X-Filename\r\n")
+            writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                          f"Content-Type: application/json; charset=utf-8\r\n"
+                          f"Content-Length: {len(data)}\r\n"
+                          f"{cors}"
+                          f"Connection: close\r\n\r\n").encode('latin-1') + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Ingest service on http://{host}:{port}, publishing to {self.output_dir}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in workers:
+                task.cancel()
+            self.pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local job queue for ingesting uploaded booklets.")
+    parser.add_argument("-o", "--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("-w", "--workers", type=int, default=2, help="booklets processed at the same time")
+    parser.add_argument("-b", "--backend", default="auto", choices=["auto", *BACKENDS],
+                        help="PDF library for PDF inputs (auto = last calibration, or pypdf)")
+    parser.add_argument("--allow-origin", default=ALLOW_ORIGIN,
+                        help="web origin allowed to call the API from a browser ('' = none)")
+    args = parser.parse_args()
+
+    service = IngestService(args.output_dir, args.workers, choose_backend(args.backend),
+                            allow_origin=args.allow_origin)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Stopped")
@@ -0,0 +1,123 @@
+import json
+import time
+from contextlib import contextmanager
+
+# Stage timers, counters, log levels and an optional cProfile hook for the
+# parsing pipeline. Module-level state: the scripts are single runs, so one
+# active instrumentation per process is all we need.
+#
+#   with instrument.stage("tokenize"):
+#       ...
+#   instrument.count("lines")
+#   instrument.log(instrument.DEBUG, "Starting Test 3...")
+
+QUIET = 0   # nothing but errors
+INFO = 1    # one-line results and warnings (default)
+DEBUG = 2   # per-test progress
+
+verbosity = INFO
+timings = {}
+counters = {}
+
+_stack = []
+_profiler = None
+
+
+def configure(level=INFO, profile=False):
+    global verbosity, _profiler
+    verbosity = level
+    _profiler = None
+    if profile:
+        # cProfile and pstats only load when profiling was asked for
+        import cProfile
+        _profiler = cProfile.Profile()
+    reset()
+
+
+def reset():
+    timings.clear()
+    counters.clear()
+    _stack.clear()
+
+
+def log(level, message):
+    if verbosity >= level:
+        print(message)
+
+
+def count(name, n=1):
+    counters[name] = counters.get(name, 0) + n
+
+
+@contextmanager
+def stage(name):
+    # Times are exclusive: while a nested stage runs, its parent is paused,
+    # so the stage times add up to the total without double counting.
+    now = time.perf_counter()
+    if _stack:
+        parent, started = _stack[-1]
+        timings[parent] = timings.get(parent, 0.0) + now - started
+    _stack.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        name, started = _stack.pop()
+        timings[name] = timings.get(name, 0.0) + now - started
+        if _stack:
+            _stack[-1][1] = now
+
+
+@contextmanager
+def profiled():
+    # No-op unless configure(profile=True) was called
+    if _profiler is None:
+        yield
+        return
+    _profiler.enable()
+    try:
+        yield
+    finally:
+        _profiler.disable()
+
+
+def profile_top(limit=15):
+    if _profiler is None:
+        return []
+    import io
+    import pstats
+    stats = pstats.Stats(_profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({func})",
+            "calls": calls,
+            "totalSeconds": round(total, 6),
+            "cumulativeSeconds": round(cumulative, 6)
+        })
+    rows.sort(key=lambda r: r['cumulativeSeconds'], reverse=True)
+    return rows[:limit]
+
+
+def report():
+    return {
+        "stages": {name: round(seconds, 6) for name, seconds in timings.items()},
+        "totalSeconds": round(sum(timings.values()), 6),
+        "counters": dict(counters),
+        "profile": profile_top()
+    }
+
+
+def write_report(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report(), f, indent=2)
+
+
+def add_arguments(parser):
+    # Shared -v/-q/--report/--profile flags for the pipeline scripts
+    parser.add_argument("-v", "--verbose", action="store_const", const=DEBUG, dest="verbosity", default=INFO,
+                        help="print per-test progress")
+    parser.add_argument("-q", "--quiet", action="store_const", const=QUIET, dest="verbosity",
+                        help="print nothing but errors")
+    parser.add_argument("--report", metavar="PATH", help="write stage timings and counters as JSON")
+    parser.add_argument("--profile", action="store_true", help="include the top cProfile entries in the report")
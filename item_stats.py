@@ -0,0 +1,332 @@
+import argparse
+import json
+import sys
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    # Required for the analysis; checked before running it
+    np = None
+
+import instrument
+from pipeline import write_json_atomic
+
+# Item statistics for the screening bank from exported play results, and a
+# precomputed adaptive test plan built on them.
+#
+# Results are JSON lines, one session per line (lines with the same session
+# id are merged):
+#
+#   {"session": "s1", "answers": [{"test": 3, "question": 7, "correct": true}, ...]}
+#
+# They become one sessions x items matrix with a mask for unanswered items.
+# Per item it computes the classical difficulty (share correct) and
+# discrimination (correlation with the rest of the session's score), then
+# fits a two-parameter logistic model, P(correct) = 1 / (1 + exp(-a (theta - b))),
+# by joint maximum a posteriori estimation: alternating Newton steps on all
+# abilities and all items at once, as array operations over every answer.
+#
+# The plan is a decision tree the app can walk without any math: each node
+# names the next question and the node to go to on a right or wrong answer;
+# leaves give the placement. Questions are picked greedily to shrink the
+# expected ability uncertainty the most, and a branch stops as soon as the
+# placement is reliable.
+#
+#   python item_stats.py results.jsonl [--stats src/data/item_stats.json] [--plan public/data/adaptive_plan.json]
+
+SCREENING_PATH = 'src/data/screening_questions.json'
+STATS_PATH = 'src/data/item_stats.json'
+PLAN_PATH = 'public/data/adaptive_plan.json'
+
+# Items answered fewer times than this get no estimates and stay out of the plan
+MIN_RESPONSES = 30
+
+# Fitting: weak normal priors keep perfect and zero scores finite
+MAX_ITERATIONS = 200
+TOLERANCE = 1e-3
+PRIOR_THETA_SD = 1.0
+PRIOR_C_SD = 3.0    # intercept, -a * b
+PRIOR_A_SD = 0.5    # around a = 1
+A_RANGE = (0.2, 4.0)
+THETA_RANGE = (-4.0, 4.0)
+
+# Placement levels on the ability scale: below the first cut is level 0
+LEVELS = ("beginner", "elementary", "intermediate", "advanced")
+CUTS = (-1.0, 0.0, 1.0)
+
+# A branch of the plan stops once the ability's standard error is this low,
+# or the placement is this likely, or after MAX_LENGTH questions
+TARGET_SE = 0.35
+TARGET_CONFIDENCE = 0.9
+MAX_LENGTH = 12
+GRID = 61
+
+
+def bank_items(tests):
+    # Column order of the results matrix: (test id, question id)
+    items = []
+    seen = set()
+    for t in tests:
+        for q in t['questions']:
+            item = (t['id'], q['id'])
+            if item not in seen:
+                seen.add(item)
+                items.append(item)
+    return items
+
+
+def load_results(paths, items):
+    # Returns (X, M): 1.0/0.0 answers and the answered mask; a repeated
+    # answer within a session keeps the last one
+    column = {item: j for j, item in enumerate(items)}
+    rows = {}
+    cells, unknown = [], 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                session = json.loads(line)
+                i = rows.setdefault(session['session'], len(rows))
+                for answer in session['answers']:
+                    j = column.get((answer['test'], answer['question']))
+                    if j is None:
+                        unknown += 1
+                    else:
+                        cells.append((i, j, bool(answer['correct'])))
+    instrument.count("answers", len(cells))
+    instrument.count("unknown_items", unknown)
+
+    X = np.zeros((len(rows), len(items)), dtype=np.float64)
+    M = np.zeros(X.shape, dtype=bool)
+    if cells:
+        i, j, correct = (np.array(column) for column in zip(*cells))
+        X[i, j] = correct
+        M[i, j] = True
+    return X, M
+
+
+def classical_stats(X, M):
+    # Share correct, and the correlation between an item and the share
+    # correct on the session's other answered items
+    answered = M.sum(axis=0)
+    Xm = np.where(M, X, 0.0)
+    p_correct = Xm.sum(axis=0) / np.maximum(answered, 1)
+
+    totals, counts = Xm.sum(axis=1, keepdims=True), M.sum(axis=1, keepdims=True)
+    others = np.maximum(counts - 1, 1)
+    rest = np.where(M, (totals - Xm) / others, 0.0)
+    usable = M & (counts > 1)
+    n = np.maximum(usable.sum(axis=0), 1)
+    mean_x = (Xm * usable).sum(axis=0) / n
+    mean_r = (rest * usable).sum(axis=0) / n
+    dx = np.where(usable, Xm - mean_x, 0.0)
+    dr = np.where(usable, rest - mean_r, 0.0)
+    denominator = np.sqrt((dx * dx).sum(axis=0) * (dr * dr).sum(axis=0))
+    discrimination = np.divide((dx * dr).sum(axis=0), denominator,
+                               out=np.zeros(X.shape[1]), where=denominator > 0)
+    return answered, p_correct, discrimination
+
+
+def logistic(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30.0, 30.0)))
+
+
+def fit_2pl(X, M, iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    # Returns (theta, a, b, se_a, se_b). Works on the answered cells only,
+    # as flat arrays: sessions play a few tests each, so most of the
+    # matrix is empty, and per-session and per-item sums are bincounts.
+    # Items are fitted as slope and intercept, z = a * theta + c, with one
+    # 2x2 Newton step each; b = -c / a. Stepping a and b separately drifts
+    # along their ridge on very easy or very hard items.
+    n_sessions, n_items = X.shape
+    rows, cols = np.nonzero(M)
+    x = X[rows, cols]
+
+    def item_sum(values):
+        return np.bincount(cols, values, n_items)
+
+    p = (item_sum(x) + 0.5) / (np.bincount(cols, minlength=n_items) + 1.0)
+    c = np.log(p / (1 - p))
+    a = np.ones(n_items)
+    score = (np.bincount(rows, x, n_sessions) + 0.5) / (np.bincount(rows, minlength=n_sessions) + 1.0)
+    theta = np.clip(np.log(score / (1 - score)), *THETA_RANGE)
+
+    for iteration in range(iterations):
+        # Abilities, with the items held fixed
+        P = logistic(a[cols] * theta[rows] + c[cols])
+        gradient = np.bincount(rows, (x - P) * a[cols], n_sessions) - theta / PRIOR_THETA_SD ** 2
+        hessian = np.bincount(rows, P * (1 - P) * a[cols] ** 2, n_sessions) + 1 / PRIOR_THETA_SD ** 2
+        new_theta = np.clip(theta + gradient / hessian, *THETA_RANGE)
+
+        # Slopes and intercepts, with the new abilities
+        t = new_theta[rows]
+        P = logistic(a[cols] * t + c[cols])
+        residual, weight = x - P, P * (1 - P)
+        g_a = item_sum(residual * t) - (a - 1) / PRIOR_A_SD ** 2
+        g_c = item_sum(residual) - c / PRIOR_C_SD ** 2
+        h_aa = item_sum(weight * t * t) + 1 / PRIOR_A_SD ** 2
+        h_ac = item_sum(weight * t)
+        h_cc = item_sum(weight) + 1 / PRIOR_C_SD ** 2
+        det = h_aa * h_cc - h_ac ** 2
+        new_a = np.clip(a + (h_cc * g_a - h_ac * g_c) / det, *A_RANGE)
+        new_c = c + (h_aa * g_c - h_ac * g_a) / det
+
+        # Fix the scale: abilities have mean 0 and standard deviation 1
+        mean, sd = new_theta.mean(), new_theta.std() or 1.0
+        new_theta = (new_theta - mean) / sd
+        new_c = new_c + new_a * mean
+        new_a = np.clip(new_a * sd, *A_RANGE)
+
+        change = max(np.abs(new_theta - theta).max(), np.abs(new_a - a).max(), np.abs(new_c - c).max())
+        theta, a, c = new_theta, new_a, new_c
+        if change < tolerance:
+            break
+    instrument.count("fit_iterations", iteration + 1)
+
+    # Standard errors from the item information at the final estimates
+    b = -c / a
+    distance = theta[rows] - b[cols]
+    P = logistic(a[cols] * distance)
+    weight = P * (1 - P)
+    se_b = 1 / np.sqrt(item_sum(weight * a[cols] ** 2) + 1e-12)
+    se_a = 1 / np.sqrt(item_sum(weight * distance ** 2) + 1 / PRIOR_A_SD ** 2)
+    return theta, a, b, se_a, se_b
+
+
+def level_of(theta):
+    return LEVELS[int(np.searchsorted(CUTS, theta))]
+
+
+class PlanBuilder:
+    # Builds the answer tree breadth first. The ability posterior lives on a
+    # fixed grid, so updating it and scoring every candidate question is a
+    # few array operations per node.
+    def __init__(self, items, a, b):
+        self.items = items
+        self.grid = np.linspace(*THETA_RANGE, GRID)
+        self.P = logistic(a[:, None] * (self.grid - b[:, None]))      # items x grid
+        self.level_mask = np.searchsorted(CUTS, self.grid)[None, :] == np.arange(len(LEVELS))[:, None]
+        self.expected_length = 0.0
+
+    def summary(self, posterior):
+        mean = float(posterior @ self.grid)
+        se = float(np.sqrt(posterior @ (self.grid - mean) ** 2))
+        confidence = float((self.level_mask @ posterior).max())
+        return mean, se, confidence
+
+    def next_item(self, posterior, used):
+        # Expected posterior variance after the answer, for every item at once
+        expected = np.zeros(len(self.items))
+        for likelihood in (self.P, 1 - self.P):
+            joint = likelihood * posterior
+            p = np.maximum(joint.sum(axis=1), 1e-12)
+            mean = joint @ self.grid / p
+            expected += joint @ (self.grid ** 2) - p * mean ** 2
+        expected[used] = np.inf
+        return int(np.argmin(expected))
+
+    def build(self):
+        prior = np.exp(-0.5 * self.grid ** 2)
+        nodes = [None]
+        pending = deque([(0, prior / prior.sum(), [], 1.0)])
+        max_length = min(MAX_LENGTH, len(self.items))
+        while pending:
+            node_id, posterior, used, reach = pending.popleft()
+            mean, se, confidence = self.summary(posterior)
+            node = {"id": node_id, "theta": round(mean, 3), "se": round(se, 3)}
+            if se <= TARGET_SE or confidence >= TARGET_CONFIDENCE or len(used) >= max_length:
+                node.update(level=level_of(mean), confidence=round(confidence, 3))
+                # reach: chance a student from the prior ends up here
+                self.expected_length += reach * len(used)
+            else:
+                j = self.next_item(posterior, used)
+                node.update(test=self.items[j][0], question=self.items[j][1])
+                for branch, likelihood in (("right", self.P[j]), ("wrong", 1 - self.P[j])):
+                    joint = posterior * likelihood
+                    p = joint.sum()
+                    node[branch] = len(nodes)
+                    nodes.append(None)
+                    pending.append((node[branch], joint / p, used + [j], reach * p))
+            nodes[node_id] = node
+        return nodes
+
+
+def item_report(items, answered, p_correct, discrimination, fitted, estimates):
+    report = []
+    for j, (test_id, q_id) in enumerate(items):
+        entry = {"test": test_id, "question": q_id, "responses": int(answered[j]),
+                 "pCorrect": round(float(p_correct[j]), 4), "discrimination": round(float(discrimination[j]), 4)}
+        if j in fitted:
+            a, b, se_a, se_b = (float(v) for v in estimates[fitted[j]])
+            entry.update(a=round(a, 4), b=round(b, 4), seA=round(se_a, 4), seB=round(se_b, 4))
+        report.append(entry)
+    return report
+
+
+def analyze(tests, result_paths):
+    items = bank_items(tests)
+    with instrument.stage("load"):
+        X, M = load_results(result_paths, items)
+    with instrument.stage("classical"):
+        answered, p_correct, discrimination = classical_stats(X, M)
+
+    # Only items with enough answers are fitted and used by the plan
+    columns = np.flatnonzero(answered >= MIN_RESPONSES)
+    if len(columns):
+        with instrument.stage("fit"):
+            theta, a, b, se_a, se_b = fit_2pl(X[:, columns], M[:, columns])
+    else:
+        # Too few sessions for any item: nothing to fit or plan
+        a = b = se_a = se_b = np.zeros(0)
+    fitted = {int(j): k for k, j in enumerate(columns)}
+    stats = {
+        "sessions": int(X.shape[0]),
+        "items": item_report(items, answered, p_correct, discrimination, fitted, np.stack([a, b, se_a, se_b], axis=1))
+    }
+
+    with instrument.stage("plan"):
+        builder = PlanBuilder([items[j] for j in columns], a, b)
+        nodes = builder.build() if len(columns) else []
+    plan = {
+        "levels": list(LEVELS),
+        "cuts": list(CUTS),
+        "targetSe": TARGET_SE,
+        "targetConfidence": TARGET_CONFIDENCE,
+        "maxLength": MAX_LENGTH,
+        "expectedLength": round(builder.expected_length, 3),
+        "nodes": nodes
+    }
+    return stats, plan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate screening item statistics and build an adaptive test plan.")
+    parser.add_argument("results", nargs="+", help="play results, one JSON session per line")
+    parser.add_argument("--bank", default=SCREENING_PATH)
+    parser.add_argument("--stats", default=STATS_PATH)
+    parser.add_argument("--plan", default=PLAN_PATH)
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+
+    if np is None:
+        print("Error: item_stats.py needs numpy")
+        sys.exit(1)
+    instrument.configure(args.verbosity, args.profile)
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        tests = json.load(f)['tests']
+    with instrument.profiled():
+        stats, plan = analyze(tests, args.results)
+        write_json_atomic(args.stats, stats)
+        write_json_atomic(args.plan, plan, indent=None)
+
+    fitted = sum(1 for item in stats['items'] if 'b' in item)
+    leaves = sum(1 for node in plan['nodes'] if 'level' in node)
+    test_length = max((len(t['questions']) for t in tests), default=0)
+    instrument.log(instrument.INFO, f"{stats['sessions']} sessions, {fitted} of {len(stats['items'])} items estimated "
+                   f"-> {args.stats}")
+    instrument.log(instrument.INFO, f"Adaptive plan: {len(plan['nodes'])} nodes, {leaves} placements, "
+                   f"{plan['expectedLength']:.1f} questions expected (a fixed test has {test_length}) -> {args.plan}")
+    if args.report:
+        instrument.write_report(args.report)
@@ -0,0 +1,119 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+# Headers, footers and other boilerplate stripped from booklet text.
+# The patterns live in noise_patterns.json:
+#
+#   "literals"  exact strings removed wherever they appear in a line
+#   "patterns"  regular expressions, removed the same way
+#   "lines"     whole lines dropped outright (usually learned, see below)
+#
+# Literals and patterns are compiled into one alternation, so a line is
+# cleaned in a single regex scan however many entries the file has.
+#
+# learn_lines() finds recurring header/footer lines in a dump: a line seen
+# on a large share of the pages is boilerplate, not content.
+#
+#   python noise_filter.py pdf_content.txt            # show what would be learned
+#   python noise_filter.py pdf_content.txt --save     # add it to noise_patterns.json
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'noise_patterns.json')
+PAGE_MARKER_PREFIX = "=== PAGE "
+
+# A line must appear on at least this share of the pages, and at least
+# MIN_REPEATS times, to be learned
+MIN_SHARE = 0.25
+MIN_REPEATS = 3
+
+
+class NoiseFilter:
+    def __init__(self, literals=(), patterns=(), lines=()):
+        self.literals = list(literals)
+        self.patterns = list(patterns)
+        self.lines = set(lines)
+        # Longest literal first, so one that contains another wins
+        parts = [re.escape(literal) for literal in sorted(self.literals, key=len, reverse=True)]
+        parts += [f"(?:{pattern})" for pattern in self.patterns]
+        self.regex = re.compile("|".join(parts)) if parts else None
+        # Changes whenever the filter would clean a dump differently; part
+        # of the parse cache key
+        config = json.dumps([sorted(self.literals), self.patterns, sorted(self.lines)], ensure_ascii=False)
+        self.fingerprint = hashlib.sha1(config.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def load(cls, path=CONFIG_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config.get('literals', []), config.get('patterns', []), config.get('lines', []))
+
+    def save(self, path=CONFIG_PATH):
+        config = {"literals": self.literals, "patterns": self.patterns, "lines": sorted(self.lines)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    def with_lines(self, lines):
+        return NoiseFilter(self.literals, self.patterns, self.lines | set(lines))
+
+    def strip(self, text):
+        return self.regex.sub("", text) if self.regex else text
+
+
+def page_line_counts(lines):
+    # How many pages each line appears on. Without page markers (older
+    # dumps) every occurrence counts, and the page count is estimated from
+    # the most repeated line, which is normally the page header.
+    counts = Counter()
+    page = set()
+    pages = 0
+    for line in lines:
+        line = line.strip()
+        if line.startswith(PAGE_MARKER_PREFIX):
+            counts.update(page)
+            page = set()
+            pages += 1
+        elif line:
+            if pages:
+                page.add(line)
+            else:
+                counts[line] += 1
+    counts.update(page)
+    if not pages:
+        pages = max(counts.values(), default=0)
+    return counts, pages
+
+
+def learn_lines(lines, keep=None, min_share=MIN_SHARE, min_repeats=MIN_REPEATS):
+    # keep(line) -> True for lines that must never be dropped, e.g. the
+    # parser's questions, options and page headers
+    counts, pages = page_line_counts(lines)
+    threshold = max(min_repeats, min_share * pages)
+    return sorted(line for line, n in counts.items()
+                  if n >= threshold and not (keep and keep(line)))
+
+
+if __name__ == "__main__":
+    from parse_questions_v3 import NOISE_FILTER, is_structural
+
+    parser = argparse.ArgumentParser(description="Learn recurring header/footer lines from a text dump.")
+    parser.add_argument("input", nargs="?", default='pdf_content.txt')
+    parser.add_argument("--min-share", type=float, default=MIN_SHARE,
+                        help="share of pages a line must appear on")
+    parser.add_argument("--save", action="store_true", help=f"add the learned lines to {os.path.basename(CONFIG_PATH)}")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        learned = learn_lines(f, is_structural, args.min_share)
+    new_lines = [line for line in learned if line not in NOISE_FILTER.lines]
+
+    for line in learned:
+        print(f"{'  ' if line in NOISE_FILTER.lines else '+ '}{line}")
+    if args.save and new_lines:
+        NOISE_FILTER.with_lines(new_lines).save()
+        print(f"Added {len(new_lines)} lines to {CONFIG_PATH}")
+    else:
+        print(f"{len(new_lines)} new lines")
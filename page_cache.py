@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+
+# On-disk cache of extracted page text, so re-ingesting an unchanged or
+# lightly edited booklet only decodes the pages that changed.
+#
+# Each page is stored under a key built from a digest of the page's raw
+# content and resources (fonts, form XObjects), its index and the
+# extractor version. On top of that, every PDF
+# (by content hash) gets a small manifest listing its page keys, so a
+# fully unchanged file is served without even opening it in the PDF
+# library. The directory is bounded in size; the least recently used
+# entries are evicted first (file mtime is bumped on every hit).
+
+CACHE_DIR = '.page_cache'
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def file_digest(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class PageCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES, extractor_version=""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extractor_version = extractor_version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def page_key(self, content_digest, page_index):
+        raw = f"{content_digest}:{page_index}:{self.extractor_version}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read(self, name):
+        path = self._path(name)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            # Missing, or evicted by another process in the meantime
+            return None
+        return data
+
+    def _write(self, name, data):
+        # Temp file + rename, so parallel workers never see partial entries
+        import tempfile
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key):
+        text = self._read(key + '.txt')
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def put(self, key, text):
+        self._write(key + '.txt', text)
+
+    def _manifest_name(self, pdf_digest):
+        raw = f"{pdf_digest}:{self.extractor_version}"
+        return "pdf-" + hashlib.sha1(raw.encode('utf-8')).hexdigest() + ".json"
+
+    def get_manifest(self, pdf_digest):
+        # Page keys of a PDF seen before, or None if any page is gone
+        manifest = self._read(self._manifest_name(pdf_digest))
+        if manifest is None:
+            return None
+        keys = json.loads(manifest)
+        if not all(os.path.exists(self._path(key + '.txt')) for key in keys):
+            return None
+        return keys
+
+    def put_manifest(self, pdf_digest, keys):
+        self._write(self._manifest_name(pdf_digest), json.dumps(keys))
+
+    def evict(self):
+        # Drop least recently used entries until the cache fits
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith('.tmp-'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -49,6 +49,10 @@ def parse_pdf_content(file_path):
         line = line.strip()
         if not line:
             continue
+
+        # Page markers written by extract_pdf_to_file.py
+        if line.startswith("=== PAGE "):
+            continue
             
         # Detect Test Start
         # Usually "5. Sınıf" is near. And a standalone number.
@@ -189,9 +193,10 @@ def parse_pdf_content(file_path):
     
     return valid_tests
 
-data = parse_pdf_content('pdf_content.txt')
-print(json.dumps(data, indent=2, ensure_ascii=False))
+if __name__ == "__main__":
+    data = parse_pdf_content('pdf_content.txt')
+    print(json.dumps(data, indent=2, ensure_ascii=False))
 
-# Save to file
-with open('src/data/screening_questions.json', 'w', encoding='utf-8') as f:
-    json.dump({"tests": data}, f, indent=2, ensure_ascii=False)
+    # Save to file
+    with open('src/data/screening_questions.json', 'w', encoding='utf-8') as f:
+        json.dump({"tests": data}, f, indent=2, ensure_ascii=False)
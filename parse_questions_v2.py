@@ -1,7 +1,7 @@
 import re
 import json
 
-def parse_pdf_content(file_path):
+def parse_tests(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         lines = f.readlines()
 
@@ -65,6 +65,10 @@ def parse_pdf_content(file_path):
         line = line.strip()
         if not line:
             continue
+
+        # Page markers written by extract_pdf_to_file.py
+        if line.startswith("=== PAGE "):
+            continue
             
         if "CEVAP ANAHTARI" in line:
             break
@@ -186,8 +190,11 @@ def parse_pdf_content(file_path):
             q['options'] = final_options
             q['correctAnswer'] = correct_index
             
-    valid_tests = [t for t in tests if len(t['questions']) > 0]
-    
+    return [t for t in tests if len(t['questions']) > 0]
+
+def parse_pdf_content(file_path):
+    valid_tests = parse_tests(file_path)
+
     # Save to file
     with open('src/data/screening_questions.json', 'w', encoding='utf-8') as f:
         json.dump({"tests": valid_tests}, f, indent=2, ensure_ascii=False)
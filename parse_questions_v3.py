@@ -1,213 +1,661 @@
+import argparse
 import re
 import json
 
-def parse_pdf_content(file_path):
-    print("Starting parsing...")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+import instrument
+from noise_filter import NoiseFilter
+from text_dump import TextDump
 
-    # 1. Parse Answer Keys first (from end of file)
-    answer_keys = {}
-    key_start_index = 0
-    
-    # Look for "CEVAP ANAHTARI" from the end
-    for i in range(len(lines) - 1, -1, -1):
-        if "CEVAP ANAHTARI" in lines[i]:
-            key_start_index = i
-            print(f"Found Key Start at line {i}")
-            break
-            
-    if key_start_index > 0:
-        for i in range(key_start_index, len(lines)):
-            line = lines[i].strip()
-            # Match "Test 1 1. C 2. A ..."
-            # Regex: Test <number> <content>
-            match = re.search(r'Test\s+(\d+)\s+(.*)', line)
-            if match:
-                test_num = int(match.group(1))
-                answers_str = match.group(2)
-                # Parse "1. C 2. A" or "1.C 2.A"
-                # Remove extra spaces
-                answers_parts = re.findall(r'(\d+)\.\s*([A-D])', answers_str)
-                test_answers = {}
-                for q_num, ans in answers_parts:
-                    test_answers[int(q_num)] = ans
-                answer_keys[test_num] = test_answers
-                print(f"Parsed Key for Test {test_num}: {len(test_answers)} answers")
-            else:
-                 # Debug: print line if it looks like it might have keys but failed regex
-                 if "Test" in line:
-                     print(f"Ignored potential key line: {line}")
+OUTPUT_PATH = 'src/data/screening_questions.json'
+CACHE_PATH = '.parse_cache.json'
 
-    # 2. Parse Questions
-    tests = []
-    current_test = None
-    current_question = None
-    
-    test_counter = 0
-    
-    # Text cleaning helper
-    def clean_text(text):
-        if not text: return ""
-        garbage = [
-            "MEB  2018 - 2019",
-            "Ölçme, Değerlendirme ve Sınav Hizmetleri Genel Müdürlüğü",
-            "http://odsgm.meb.gov.tr/kurslar/",
-            "Cevap anahtarına ulaşmak için karekodu okutunuz.",
-            "5. Sınıf",
-            "İngilizce"
-        ]
-        text = text.strip()
-        for g in garbage:
-            text = text.replace(g, "")
-        
-        # Remove standalone numbers that are page numbers
-        if re.match(r'^\d+$', text):
-            return ""
-            
-        return text.strip()
-
-    for i, line in enumerate(lines):
+# Bump when parsing output changes, so old cache entries are ignored
+PARSER_VERSION = 5
+
+# Common PDF headers/footers, removed from every line (noise_patterns.json)
+NOISE_FILTER = NoiseFilter.load()
+
+# Question "1. ..." (text after the dot may be empty) or option "A) ..."
+LINE_RE = re.compile(r'(?:(\d+)\.(?:\s*(.*))?$|[A-D]\))')
+# Answer key line "Test 1 1. C 2. A ..."
+KEY_LINE_RE = re.compile(r'Test\s+(\d+)\s+(.*)')
+KEY_ANSWER_RE = re.compile(r'(\d+)\.\s*([A-D])')
+# "12.sorunun ..." / "3. soruları ...": an instruction about question 12,
+# not question 12 itself ("soru" = question). A question starts a sentence,
+# so "11. Sorunun doğru cevabını ..." still is one
+INSTRUCTION_RE = re.compile(r'soru')
+# Option marker "A)" or "B )", at the start, after whitespace or after ")";
+# matched by split_option_text
+OPTION_MARKER_LETTERS = "ABCD"
+# Page header "5. Sınıf", sometimes with the test number in front ("3 5. Sınıf")
+GRADE_HEADER_RE = re.compile(r'(?:(\d+)\s+)?\d+\.\s*Sınıf$')
+# The standalone test number follows the header within this many lines
+# ("İngilizce", an optional topic title, then the number); the rest of
+# those lines are header too
+HEADER_WINDOW = 3
+
+KEY_HEADER = "CEVAP ANAHTARI"
+PAGE_MARKER_PREFIX = "=== PAGE "
+
+# Token types produced by tokenize(); every token also ends with the index
+# of its source line, e.g. (QUESTION, 1, "David is from - - - -.", 8)
+QUESTION = "question"   # (QUESTION, number, text, line)
+OPTION = "option"       # (OPTION, text, None, line)
+TEXT = "text"           # (TEXT, text, None, line) - continuation of question or option
+KEY = "key"             # (KEY, test number, {question number: letter}, line)
+NOISE = "noise"         # (NOISE, None, None, line) - headers, footers, page numbers
+TEST_MARK = "mark"      # (TEST_MARK, test number, None, line) - test number in a page header
+
+LETTERS = ['A', 'B', 'C', 'D']
+
+
+def clean_text(text, noise=NOISE_FILTER):
+    if not text: return ""
+    text = noise.strip(text.strip())
+
+    # Remove standalone numbers that are page numbers
+    if text.isdecimal():
+        return ""
+
+    return text.strip()
+
+
+def is_structural(line):
+    # Lines the tokenizer needs to see, never to be learned as noise
+    line = line.strip()
+    return (line.isdecimal() or line.startswith(PAGE_MARKER_PREFIX) or KEY_HEADER in line
+            or bool(LINE_RE.match(line) or GRADE_HEADER_RE.match(line) or KEY_LINE_RE.search(line)))
+
+
+def tokenize_keys(lines, first_line=0):
+    # Answer key section: "Test 1 1. C 2. A ..." lines
+    line_count = key_lines = 0
+    for line_count, line in enumerate(lines, 1):
         line = line.strip()
-        if not line:
+        match = KEY_LINE_RE.search(line)
+        if match:
+            key_lines += 1
+            answers = {int(q_num): ans for q_num, ans in KEY_ANSWER_RE.findall(match.group(2))}
+            yield (KEY, int(match.group(1)), answers, first_line + line_count - 1)
+        elif "Test" in line:
+            # Debug: line looks like it might have keys but failed regex
+            instrument.log(instrument.DEBUG, f"Ignored potential key line: {line}")
+    instrument.count("lines", line_count)
+    instrument.count("key_lines", key_lines)
+
+
+def tokenize(lines, first_line=0, noise=NOISE_FILTER):
+    # Classify every line exactly once. Everything after the answer key
+    # header belongs to the key section, so a single forward pass covers both.
+    # This loop runs once per line of the booklet: lookups are bound to
+    # locals and clean_text is inlined for text and option lines.
+    lines = iter(lines)
+    i = first_line - 1
+    header_lines_left = 0
+    noise_lines = noise.lines
+    noise_sub = noise.regex.sub if noise.regex else None
+    line_match = LINE_RE.match
+
+    for i, line in enumerate(lines, first_line):
+        line = line.strip()
+        if not line or line.startswith(PAGE_MARKER_PREFIX):
             continue
-            
-        if "CEVAP ANAHTARI" in line:
+
+        # "5. Sınıf" would otherwise read as question 5
+        if "Sınıf" in line:
+            header = GRADE_HEADER_RE.match(line)
+            if header:
+                yield (TEST_MARK, int(header.group(1)), None, i) if header.group(1) else (NOISE, None, None, i)
+                header_lines_left = HEADER_WINDOW
+                continue
+        if header_lines_left:
+            header_lines_left -= 1
+            if line.isdecimal():
+                yield (TEST_MARK, int(line), None, i)
+                continue
+            # The rest of the header block ("İngilizce", the topic title),
+            # up to the page's first question, option or instruction
+            if not (line_match(line) or "soru" in line):
+                yield (NOISE, None, None, i)
+                continue
+            header_lines_left = 0
+
+        if KEY_HEADER in line:
+            instrument.log(instrument.DEBUG, f"Found Key Start at line {i}")
+            with instrument.stage("key_scan"):
+                yield from tokenize_keys(lines, i + 1)
             break
 
-        # Check for Test Start roughly
-        # Heuristic: If we see a Question 1, and we have enough questions in previous test
-        
-        # Pattern for Question: "^(\d+)\." - Allow empty text after dot
-        q_match = re.match(r'^(\d+)\.(\s*(.*))?$', line)
-        
-        # Pattern for Option: "^[A-D]\)" or "A)" inside line? 
-        opt_match = re.match(r'^([A-D])\)\s*(.*)', line)
-        
-        # Special case: Option A) might be stuck to text? No, usually distinct line.
-
-        if q_match:
-            q_num = int(q_match.group(1))
-            raw_text = q_match.group(3) if q_match.group(3) else ""
-            q_text = clean_text(raw_text)
-            
-            # Logic to switch test
-            if q_num == 1:
-                # If we were building a question, save it
-                if current_question:
-                    if current_test:
-                        current_test['questions'].append(current_question)
-                    current_question = None
-
-                # Start new test if needed
-                if current_test is None or (len(current_test['questions']) > 2): # Heuristic > 2
-                    test_counter += 1
-                    current_test = {
-                        "id": test_counter,
-                        "title": f"Test {test_counter}",
-                        "questions": []
-                    }
-                    tests.append(current_test)
-                    print(f"Starting Test {test_counter}...")
-            
-            # Save previous question
-            elif current_question:
-                if current_test:
-                    current_test['questions'].append(current_question)
-                current_question = None
-            
-            # Start new question
-            current_question = {
-                "id": q_num,
-                "text": q_text,
-                "options": [],
-                "userAnswer": None,
-                "correctAnswer": -1 # Initialize
-            }
-            
-        elif opt_match and current_question:
-            # Option line
-            opt_line = clean_text(line)
-            if opt_line:
-                current_question['options'].append(opt_line)
-            
-        elif current_question:
-            # Continuation
-            cleaned = clean_text(line)
-            if cleaned:
-                if len(current_question['options']) > 0:
-                    current_question['options'][-1] += " " + cleaned
+        if line in noise_lines:
+            yield (NOISE, None, None, i)
+            continue
+
+        match = line_match(line)
+        if match:
+            number, text = match.groups()
+            if number:
+                if not (text and INSTRUCTION_RE.match(text)):
+                    yield (QUESTION, int(number), clean_text(text, noise), i)
+                    continue
+                kind = TEXT
+            else:
+                kind = OPTION
+        else:
+            kind = TEXT
+
+        # clean_text(line, noise); the line is already stripped
+        cleaned = noise_sub("", line) if noise_sub else line
+        cleaned = "" if cleaned.isdecimal() else cleaned.strip()
+        yield (kind, cleaned, None, i) if cleaned else (NOISE, None, None, i)
+
+    instrument.count("lines", i - first_line + 1)
+
+
+def key_question_counts(tokens):
+    # The answer key closes the token stream; a row's highest question
+    # number is the length of that test
+    counts = {}
+    for kind, value, extra, _ in reversed(tokens):
+        if kind != KEY:
+            break
+        counts.setdefault(value, max(extra, default=0))
+    return counts
+
+
+def starts_list(tokens, start):
+    # A "1." followed by another question before any option is the first
+    # item of a numbered list, not the first question of a test
+    for i in range(start + 1, len(tokens)):
+        kind = tokens[i][0]
+        if kind == QUESTION:
+            return True
+        if kind == OPTION or kind == KEY:
+            return False
+    return False
+
+
+def split_test_blocks(tokens):
+    # Cut the token stream into one block per test, in one pass. A test
+    # starts at the first question after a page header with a new test
+    # number. Pages without one fall back to question "1." once the
+    # current test is as long as its answer key row (or has more than 2
+    # questions when the key has no row for it), so a stray "1." inside a
+    # passage doesn't split a test; nor does a "1." that opens a numbered
+    # list. List items numbered below the last question are not counted,
+    # see assemble_questions.
+    tokens = tokens if isinstance(tokens, list) else list(tokens)
+    expected = key_question_counts(tokens)
+    blocks = []
+    answer_keys = {}
+    current_block = None
+    question_count = last_question = 0
+    marked_test = None
+
+    for i, token in enumerate(tokens):
+        kind, value, extra, _ = token
+        if kind == KEY:
+            answer_keys[value] = extra
+            instrument.log(instrument.DEBUG, f"Parsed Key for Test {value}: {len(extra)} answers")
+            continue
+
+        if kind == TEST_MARK:
+            # Applies to the next question only
+            marked_test = value
+            continue
+
+        if kind == QUESTION:
+            test_id = len(blocks)
+            if marked_test is not None and marked_test > test_id:
+                new_block = True
+            elif value != 1:
+                new_block = False
+            elif current_block is None:
+                new_block = True
+            elif starts_list(tokens, i):
+                new_block = False
+            elif test_id in expected:
+                new_block = last_question >= expected[test_id]
+            else:
+                new_block = question_count > 2
+
+            if new_block:
+                current_block = []
+                blocks.append(current_block)
+                question_count = last_question = 0
+                instrument.log(instrument.DEBUG, f"Starting Test {len(blocks)}...")
+                if marked_test is not None and marked_test != len(blocks):
+                    instrument.log(instrument.DEBUG, f"Page header says Test {marked_test}")
+            if value > last_question:
+                question_count += 1
+                last_question = value
+            marked_test = None
+
+        if current_block is not None and kind != NOISE:
+            current_block.append(token)
+
+    instrument.count("tests", len(blocks))
+    return blocks, answer_keys
+
+
+class Question:
+    # Text and option fragments go into one list and are joined once in
+    # raw_options()/to_dict(); option_starts marks where each option begins
+    __slots__ = ('id', 'parts', 'option_starts', 'options', 'correct_answer')
+
+    def __init__(self, q_id, text):
+        self.id = q_id
+        self.parts = [text]
+        self.option_starts = []
+        self.options = None
+        self.correct_answer = -1
+
+    def add_option(self, text):
+        self.option_starts.append(len(self.parts))
+        self.parts.append(text)
+
+    def add_text(self, text):
+        # Continuation of the last option, or of the question text
+        self.parts.append(text)
+
+    def set_options(self, options):
+        # The split options replace the raw option fragments
+        if self.option_starts:
+            del self.parts[self.option_starts[0]:]
+            self.option_starts = []
+        self.options = options
+
+    @property
+    def text(self):
+        end = self.option_starts[0] if self.option_starts else len(self.parts)
+        return " ".join(self.parts[:end])
+
+    def option_text(self):
+        return " ".join(self.parts[self.option_starts[0]:]) if self.option_starts else ""
+
+    def raw_options(self):
+        bounds = self.option_starts + [len(self.parts)]
+        return [" ".join(self.parts[start:stop]) for start, stop in zip(bounds, bounds[1:])]
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "text": self.text,
+            "options": self.raw_options() if self.options is None else self.options,
+            "userAnswer": None,
+            "correctAnswer": self.correct_answer
+        }
+
+
+class Test:
+    __slots__ = ('id', 'questions')
+
+    def __init__(self, test_id, questions):
+        self.id = test_id
+        self.questions = questions
+
+    def to_dict(self):
+        return new_test(self.id, [q.to_dict() for q in self.questions])
+
+
+def assemble_questions(block):
+    # A block always starts with its first question token. Question numbers
+    # only go up within a test; "1." - "4." after question 9 are the items
+    # of a matching list in its passage and stay part of its text
+    questions = []
+    current_question = None
+
+    for kind, value, extra, _ in block:
+        if kind == QUESTION and current_question is not None and value <= current_question.id:
+            current_question.add_text(f"{value}. {extra}" if extra else f"{value}.")
+
+        elif kind == QUESTION:
+            current_question = Question(value, extra)
+            questions.append(current_question)
+
+        elif kind == OPTION:
+            current_question.add_option(value)
+
+        elif kind == TEXT:
+            current_question.add_text(value)
+
+    instrument.count("questions", len(questions))
+    return questions
+
+
+def new_test(test_id, questions):
+    return {
+        "id": test_id,
+        "title": f"Test {test_id}",
+        "questions": questions
+    }
+
+
+def assemble_tests(tokens):
+    with instrument.stage("assemble"):
+        blocks, answer_keys = split_test_blocks(tokens)
+        tests = [Test(test_id, assemble_questions(block)) for test_id, block in enumerate(blocks, 1)]
+    return tests, answer_keys
+
+
+def split_option_text(text):
+    # Split the joined option text on "A)".."D)" markers in one pass.
+    # Handles one option per line as well as two or four per line
+    # ("A) I - III - II B) II - I - III"). A marker only counts when it
+    # starts the text or follows whitespace or another marker, and only the
+    # first marker of each letter is used; later ones stay part of the text.
+    # Returns (options, letters, ambiguous), options ordered by letter, or
+    # (None, [], ambiguous) with fewer than two markers.
+    #
+    # Markers are what re.finditer(r'([A-D])(?<![^\s)][A-D])\s?\)', text)
+    # would find. Every marker ends at a ")", so only those are looked at;
+    # running that regex over the whole text cost more than all the rest of
+    # the option splitting.
+    letters = ""
+    starts = []
+    ends = []
+    ambiguous = False
+    end = text.find(')')
+    while end != -1:
+        start = end - 1
+        if start > 0 and text[start].isspace():
+            start -= 1
+        if start >= 0:
+            letter = text[start]
+            if letter in OPTION_MARKER_LETTERS and (start == 0 or text[start - 1].isspace() or text[start - 1] == ')'):
+                if letter in letters:
+                    ambiguous = True
                 else:
-                    current_question['text'] += " " + cleaned
+                    letters += letter
+                    starts.append(start)
+                    ends.append(end + 1)
+        end = text.find(')', end + 1)
+
+    if len(letters) < 2:
+        return None, [], ambiguous or bool(letters)
+
+    starts.append(len(text))
+    options = [text[opt_start:opt_end].strip() for opt_start, opt_end in zip(ends, starts[1:])]
+    # Almost always already in order
+    if letters not in OPTION_MARKER_LETTERS:
+        ordered = sorted(zip(letters, options))
+        letters = "".join(letter for letter, _ in ordered)
+        options = [option for _, option in ordered]
+    return options, list(letters), ambiguous or len(letters) != len(LETTERS)
+
 
-    # Add last question
-    if current_question and current_test:
-        current_test['questions'].append(current_question)
+def split_options(raw_opts):
+    # split_option_text on the raw option fragments; the fragments come
+    # back unchanged when they could not be split
+    options, letters, ambiguous = split_option_text(" ".join(raw_opts))
+    return raw_opts if options is None else options, letters, ambiguous
 
-    # 3. Clean up Options and Assign Correct Answers
-    letters = ['A', 'B', 'C', 'D']
-    
+
+def assign_test_answers(test, key_map):
+    # Clean up Options and Assign Correct Answers
+    ambiguous = []
+    for q in test.questions:
+        # Correct answer from key
+        correct_letter = key_map.get(q.id)
+
+        # Joining every option fragment at once gives the same text as
+        # joining raw_options(), without building that list first
+        final_options, letters, is_ambiguous = split_option_text(q.option_text())
+        if final_options is None:
+            final_options = q.raw_options()
+        if is_ambiguous:
+            ambiguous.append(q.id)
+            instrument.log(instrument.INFO, f"Ambiguous options: Test {test.id} Q{q.id}")
+
+        correct_index = -1
+        if letters:
+            if correct_letter in letters:
+                correct_index = letters.index(correct_letter)
+        # Fallback: options weren't split, but 4 raw items are most likely A-D
+        elif len(final_options) == 4 and correct_letter:
+            correct_index = LETTERS.index(correct_letter)
+
+        q.set_options(final_options)
+        q.correct_answer = correct_index
+    return ambiguous
+
+
+def assign_answers(tests, answer_keys):
+    ambiguous = []
     for test in tests:
-        test_id = test['id']
-        key_map = answer_keys.get(test_id, {})
-        print(f"Processing Test {test_id}, Key Map Size: {len(key_map)}")
-        
-        for q in test['questions']:
-            q_id = q['id']
-            # Correct answer from key
-            if q_id in key_map:
-                correct_letter = key_map[q_id]
-            else:
-                correct_letter = None
-                
-            # Parse options
-            raw_opts = q['options']
-            full_opt_text = " ".join(raw_opts)
-            
-            starts = []
-            for letter in letters:
-                pattern = f"{letter}\)"
-                idx = full_opt_text.find(pattern)
-                if idx != -1:
-                    starts.append((idx, letter))
-            
-            starts.sort()
-            
-            final_options = []
-            correct_index = -1
-            
-            if len(starts) >= 2:
-                for i in range(len(starts)):
-                    start_idx = starts[i][0] + 2
-                    end_idx = starts[i+1][0] if i < len(starts)-1 else len(full_opt_text)
-                    opt_val = full_opt_text[start_idx:end_idx].strip()
-                    final_options.append(opt_val)
-                    
-                    if correct_letter and starts[i][1] == correct_letter:
-                        correct_index = i
-            else:
-                 final_options = raw_opts
-                 # Fallback: if we didn't parse clean options, maybe we can't determine correct index easily
-                 # But if we have 4 items in raw_opts?
-                 if len(final_options) == 4 and correct_letter:
-                     correct_index = letters.index(correct_letter)
-            
-            q['options'] = final_options
-            if correct_index != -1:
-                q['correctAnswer'] = correct_index
-            else:
-                # Last resort debug
-                if correct_letter:
-                     # Maybe only A, B, C found but D missing?
-                     pass
-
-    valid_tests = [t for t in tests if len(t['questions']) > 0]
-    
-    # Save to file
-    with open('src/data/screening_questions.json', 'w', encoding='utf-8') as f:
-        json.dump({"tests": valid_tests}, f, indent=2, ensure_ascii=False)
-        
-    print(f"Saved {len(valid_tests)} tests to src/data/screening_questions.json")
+        key_map = answer_keys.get(test.id, {})
+        instrument.log(instrument.DEBUG, f"Processing Test {test.id}, Key Map Size: {len(key_map)}")
+        ambiguous.extend((test.id, q_id) for q_id in assign_test_answers(test, key_map))
+    return ambiguous
+
+
+def finalize_tests(tests):
+    # Records -> JSON-ready dicts, dropping each record once converted so
+    # both forms of the whole booklet are never in memory at the same time
+    tests.reverse()
+    finalized = []
+    while tests:
+        test = tests.pop()
+        if test.questions:
+            finalized.append(test.to_dict())
+    return finalized
+
+
+def parse_tokens(tokens):
+    tests, answer_keys = assemble_tests(tokens)
+    with instrument.stage("options"):
+        assign_answers(tests, answer_keys)
+    return finalize_tests(tests)
+
+
+def parse_lines(lines, noise=NOISE_FILTER):
+    with instrument.stage("tokenize"):
+        tokens = list(tokenize(lines, noise=noise))
+    return parse_tokens(tokens)
+
+
+def tokenize_dump(dump, noise=NOISE_FILTER):
+    # Jump straight to the answer key through the line index instead of
+    # reading up to it. Questions stop at the first key header, the key is
+    # read from the last one.
+    body_end = dump.find_line(KEY_HEADER)
+    if body_end is None:
+        yield from tokenize(dump.lines(), noise=noise)
+        return
+
+    yield from tokenize(dump.lines(0, body_end), noise=noise)
+    key_start = dump.find_line(KEY_HEADER, last=True)
+    instrument.log(instrument.DEBUG, f"Found Key Start at line {key_start}")
+    with instrument.stage("key_scan"):
+        yield from tokenize_keys(dump.lines(key_start + 1), key_start + 1)
+
+
+def parse_dump(dump):
+    with instrument.stage("tokenize"):
+        tokens = list(tokenize_dump(dump))
+    return parse_tokens(tokens)
+
+
+def test_byte_ranges(dump, blocks):
+    # Each test runs from its question "1." up to the next test's, the
+    # last one up to the answer key
+    starts = [block[0][3] for block in blocks]
+    body_end = dump.find_line(KEY_HEADER)
+    stops = starts[1:] + [dump.line_count if body_end is None else body_end]
+    return [dump.byte_range(start, stop) for start, stop in zip(starts, stops)]
+
+
+def parse_test_range(dump, start_byte, end_byte, test_id, key_map=None):
+    # Re-parse a single test from its byte range without touching the rest
+    first_line = dump.line_at(start_byte)
+    tokens = [t for t in tokenize(dump.lines_between(start_byte, end_byte), first_line) if t[0] != NOISE]
+    while tokens and tokens[0][0] != QUESTION:
+        tokens.pop(0)
+    test = Test(test_id, assemble_questions(tokens))
+    assign_test_answers(test, key_map or {})
+    return test.to_dict()
+
+
+def block_digest(block, key_map):
+    # A test's result depends only on its own tokens and its key row;
+    # line numbers are left out so edits elsewhere don't invalidate it
+    import hashlib
+
+    tokens = [token[:3] for token in block]
+    payload = json.dumps([PARSER_VERSION, tokens, sorted(key_map.items())], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == PARSER_VERSION else {}
+
+
+def cache_source(dump, noise=NOISE_FILTER):
+    # What a cached parse was made from: the dump and the noise filter
+    # (editing noise_patterns.json changes the tokens without the dump)
+    return f"{dump.digest()}:{noise.fingerprint}"
+
+
+def parse_cached(file_path, cache_path=CACHE_PATH, noise=NOISE_FILTER):
+    # Re-parse only the tests whose source block changed since the last run.
+    # Results are cached per test, keyed by a hash of the block's tokens.
+    with TextDump(file_path) as dump:
+        return _parse_cached(dump, cache_path, noise)
+
+
+def _parse_cached(dump, cache_path, noise):
+    source_digest = cache_source(dump, noise)
+
+    with instrument.stage("cache"):
+        cache = load_cache(cache_path)
+    entries = cache.get('tests', {})
+    digests = cache.get('order', [])
+
+    if cache.get('source') == source_digest and all(d in entries for d in digests):
+        instrument.log(instrument.INFO, "Input unchanged, using cached tests")
+    else:
+        with instrument.stage("tokenize"):
+            tokens = list(tokenize_dump(dump, noise))
+        with instrument.stage("assemble"):
+            blocks, answer_keys = split_test_blocks(tokens)
+
+        digests = []
+        reparsed = 0
+        for test_id, block in enumerate(blocks, 1):
+            key_map = answer_keys.get(test_id, {})
+            with instrument.stage("cache"):
+                digest = block_digest(block, key_map)
+            if digest not in entries:
+                with instrument.stage("assemble"):
+                    test = Test(test_id, assemble_questions(block))
+                with instrument.stage("options"):
+                    assign_test_answers(test, key_map)
+                entries[digest] = test.to_dict()['questions']
+                reparsed += 1
+            digests.append(digest)
+        instrument.count("reparsed_tests", reparsed)
+        instrument.log(instrument.INFO, f"Re-parsed {reparsed} of {len(blocks)} tests")
+
+        # Keep only the entries the current input still uses
+        cache = {
+            "version": PARSER_VERSION,
+            "source": source_digest,
+            "order": digests,
+            "ranges": test_byte_ranges(dump, blocks),
+            "tests": {d: entries[d] for d in digests}
+        }
+        with instrument.stage("cache"):
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+
+    tests = [new_test(test_id, entries[d]) for test_id, d in enumerate(digests, 1)]
+    return [t for t in tests if len(t['questions']) > 0]
+
+
+def save_tests(tests, output_path=OUTPUT_PATH):
+    # Skip the write when nothing changed
+    with instrument.stage("json_dump"):
+        return _save_tests(tests, output_path)
+
+
+def _save_tests(tests, output_path):
+    text = json.dumps({"tests": tests}, indent=2, ensure_ascii=False)
+    try:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                instrument.log(instrument.INFO, f"{output_path} is up to date")
+                return False
+    except OSError:
+        pass
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    instrument.log(instrument.INFO, f"Saved {len(tests)} tests to {output_path}")
+    return True
+
+
+def parse_pdf_content(file_path, output_path=OUTPUT_PATH, cache_path=CACHE_PATH):
+    instrument.log(instrument.DEBUG, "Starting parsing...")
+    if cache_path:
+        valid_tests = parse_cached(file_path, cache_path)
+    else:
+        with TextDump(file_path) as dump:
+            valid_tests = parse_dump(dump)
+
+    save_tests(valid_tests, output_path)
+    return valid_tests
+
+
+def read_answer_keys(dump):
+    key_start = dump.find_line(KEY_HEADER, last=True)
+    if key_start is None:
+        return {}
+    return {t[1]: t[2] for t in tokenize_keys(dump.lines(key_start + 1), key_start + 1)}
+
+
+def parse_single_test(file_path, test_id, cache_path=CACHE_PATH):
+    # Uses the byte ranges from the cache when the input hasn't changed,
+    # otherwise indexes the test boundaries first
+    with TextDump(file_path) as dump:
+        cache = load_cache(cache_path) if cache_path else {}
+        if cache.get('source') == cache_source(dump) and 'ranges' in cache:
+            ranges = cache['ranges']
+        else:
+            blocks, _ = split_test_blocks(tokenize_dump(dump))
+            ranges = test_byte_ranges(dump, blocks)
+
+        if not 1 <= test_id <= len(ranges):
+            raise ValueError(f"Test {test_id} not found, the dump has {len(ranges)} tests")
+        start, end = ranges[test_id - 1]
+        return parse_test_range(dump, start, end, test_id, read_answer_keys(dump).get(test_id))
+
+
+def add_arguments(parser):
+    # Shared with engquest_ingest.py's parse subcommand
+    parser.add_argument("input", nargs="?", default='pdf_content.txt')
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("--no-cache", action="store_true", help="re-parse every test")
+    parser.add_argument("--test", type=int, metavar="N", help="re-parse only test N and print it")
+    instrument.add_arguments(parser)
+
+
+def main(args):
+    instrument.configure(args.verbosity, args.profile)
+    cache_path = None if args.no_cache else CACHE_PATH
+    with instrument.profiled():
+        if args.test:
+            print(json.dumps(parse_single_test(args.input, args.test, cache_path), indent=2, ensure_ascii=False))
+        else:
+            parse_pdf_content(args.input, args.output, cache_path)
+    if args.report:
+        instrument.write_report(args.report)
+
 
 if __name__ == "__main__":
-    parse_pdf_content('pdf_content.txt')
+    parser = argparse.ArgumentParser(description="Parse screening tests from a PDF text dump.")
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,295 @@
+import hashlib
+import importlib.util
+import json
+import os
+import time
+
+# Text extraction backends behind extract_pdf_to_file.py. Each backend is a
+# document class: open it on a path, then ask for page_count, page_text(i)
+# and page_digest(i) (a hash of the page's raw content and the resources
+# its text is decoded with, for the page cache).
+# Libraries are imported only when a backend is actually opened.
+#
+# calibrate() times every installed backend on a sample of pages, checks
+# its text against a reference and picks the fastest acceptable one; the
+# choice is remembered in CALIBRATION_PATH per set of installed versions.
+
+CALIBRATION_PATH = '.pdf_backend.json'
+PAGE_MARKER_PREFIX = "=== PAGE "
+SAMPLE_PAGES = 5
+MIN_QUALITY = 0.9
+
+
+class PypdfDocument:
+    name = "pypdf"
+    module = "pypdf"
+    # The installed package, for its version
+    distribution = "pypdf"
+
+    def __init__(self, path):
+        import pypdf
+        self.reader = pypdf.PdfReader(path)
+        self.page_count = len(self.reader.pages)
+        self._digests = {}
+
+    def page_text(self, index):
+        return self.reader.pages[index].extract_text()
+
+    def page_digest(self, index):
+        page = self.reader.pages[index]
+        contents = page.get_contents()
+        sha = hashlib.sha1(contents.get_data() if contents is not None else b"")
+        sha.update(object_digest(inherited(page, '/Resources'), self._digests).encode('ascii'))
+        return sha.hexdigest()
+
+    def close(self):
+        pass
+
+
+class PyPDF2Document(PypdfDocument):
+    # PyPDF2 3.x is pypdf's predecessor and has the same page API
+    name = "PyPDF2"
+    module = "PyPDF2"
+    distribution = "PyPDF2"
+
+    def __init__(self, path):
+        import PyPDF2
+        self.reader = PyPDF2.PdfReader(path)
+        self.page_count = len(self.reader.pages)
+        self._digests = {}
+
+
+class PdfminerDocument:
+    name = "pdfminer"
+    module = "pdfminer"
+    distribution = "pdfminer.six"
+
+    def __init__(self, path):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        self._file = open(path, 'rb')
+        try:
+            document = PDFDocument(PDFParser(self._file))
+            self.pages = list(PDFPage.create_pages(document))
+        except Exception:
+            self._file.close()
+            raise
+        self.page_count = len(self.pages)
+        self._digests = {}
+
+    def page_text(self, index):
+        import io
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+
+        output = io.StringIO()
+        manager = PDFResourceManager()
+        device = TextConverter(manager, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(manager, device).process_page(self.pages[index])
+        finally:
+            device.close()
+        return output.getvalue()
+
+    def page_digest(self, index):
+        from pdfminer.pdftypes import resolve1
+
+        page = self.pages[index]
+        sha = hashlib.sha1()
+        for stream in page.contents:
+            sha.update(resolve1(stream).get_data())
+        sha.update(object_digest(page.resources, self._digests).encode('ascii'))
+        return sha.hexdigest()
+
+    def close(self):
+        self._file.close()
+
+
+def inherited(page, key):
+    # A page without its own /Resources (or /MediaBox, /Rotate) takes them
+    # from the nearest /Pages node above it. pdfminer merges these into the
+    # page, and so does pypdf when it flattens reader.pages; walking /Parent
+    # keeps the page key right without relying on that
+    node, seen = page, set()
+    while node is not None and id(node) not in seen:
+        if key in node:
+            return node[key]
+        seen.add(id(node))
+        node = node['/Parent'] if '/Parent' in node else None
+    return None
+
+
+def pdf_name(value):
+    # pypdf names keep their slash ("/Image"), pdfminer's are PSLiterals
+    return str(getattr(value, 'name', value)).lstrip('/')
+
+
+def object_digest(value, memo):
+    # Hash of a PDF object with its references followed: the same content
+    # stream decodes to different text under other fonts or encodings, and
+    # form XObjects carry text of their own. Referenced objects are hashed
+    # once per document in memo; image data is skipped, text never reads it
+    if hasattr(value, 'idnum') or hasattr(value, 'objid'):
+        # pypdf IndirectObject, pdfminer PDFObjRef
+        ref = (value.idnum, value.generation) if hasattr(value, 'idnum') else value.objid
+        if ref not in memo:
+            # Marked first, so a cycle back to it stops here
+            memo[ref] = f"ref:{ref}"
+            target = value.get_object() if hasattr(value, 'idnum') else value.resolve()
+            memo[ref] = object_digest(target, memo)
+        return memo[ref]
+
+    sha = hashlib.sha1()
+    if hasattr(value, 'get_data'):
+        # A stream; pdfminer keeps its dictionary in attrs
+        attrs = getattr(value, 'attrs', value)
+        subtype = attrs.get('/Subtype', attrs.get('Subtype'))
+        if subtype is None or pdf_name(subtype) != "Image":
+            sha.update(value.get_data())
+        value = attrs
+    if isinstance(value, dict):
+        for key in sorted(value, key=pdf_name):
+            sha.update(f"{pdf_name(key)}={object_digest(dict.__getitem__(value, key), memo)};".encode('utf-8'))
+    elif isinstance(value, list):
+        sha.update(",".join(object_digest(item, memo) for item in value).encode('ascii'))
+    else:
+        sha.update(repr(value).encode('utf-8'))
+    return sha.hexdigest()
+
+
+BACKENDS = {cls.name: cls for cls in (PypdfDocument, PdfminerDocument, PyPDF2Document)}
+DEFAULT_BACKEND = "pypdf"
+
+
+def is_available(name):
+    return importlib.util.find_spec(BACKENDS[name].module) is not None
+
+
+def available_backends():
+    return [name for name in BACKENDS if is_available(name)]
+
+
+def backend_version(name):
+    # Part of the page cache key: another library or version may extract
+    # differently. Read from the package metadata, so checking the installed
+    # versions doesn't import every PDF library (importlib.metadata itself
+    # takes a while to load, so only here)
+    import importlib.metadata
+
+    try:
+        version = importlib.metadata.version(BACKENDS[name].distribution)
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"{name}-{version}"
+
+
+def open_document(path, backend=DEFAULT_BACKEND):
+    return BACKENDS[backend](path)
+
+
+def normalize(text):
+    return " ".join(text.split())
+
+
+def sample_indices(page_count, sample_pages=SAMPLE_PAGES):
+    if page_count <= sample_pages:
+        return list(range(page_count))
+    step = page_count / sample_pages
+    return [int(i * step) for i in range(sample_pages)]
+
+
+def reference_pages(reference_path):
+    # Page texts from a known-good dump written with page markers
+    pages = []
+    with open(reference_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith(PAGE_MARKER_PREFIX):
+                pages.append([])
+            elif pages:
+                pages[-1].append(line)
+    return ["".join(page) for page in pages]
+
+
+def calibrate(pdf_path, reference_path=None, sample_pages=SAMPLE_PAGES, min_quality=MIN_QUALITY):
+    # Time every installed backend on the same sample pages and score its
+    # text against the reference: a reference dump if given, otherwise the
+    # default backend's output. Returns (best backend name, results).
+    import difflib
+
+    results = {}
+    texts = {}
+    indices = []
+    for name in available_backends():
+        try:
+            # Import first so the timing doesn't include loading the library
+            __import__(BACKENDS[name].module)
+            start = time.perf_counter()
+            document = open_document(pdf_path, name)
+            try:
+                indices = sample_indices(document.page_count, sample_pages)
+                texts[name] = [document.page_text(i) for i in indices]
+            finally:
+                document.close()
+            results[name] = {"seconds": time.perf_counter() - start}
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    if reference_path:
+        reference = reference_pages(reference_path)
+        reference = [reference[i] if i < len(reference) else "" for i in indices]
+    else:
+        reference = texts.get(DEFAULT_BACKEND) or next(iter(texts.values()), [])
+
+    for name, pages in texts.items():
+        scores = [difflib.SequenceMatcher(None, normalize(a), normalize(b)).ratio()
+                  for a, b in zip(pages, reference)]
+        results[name]["quality"] = sum(scores) / len(scores) if scores else 0.0
+
+    acceptable = [name for name, r in results.items() if r.get("quality", 0.0) >= min_quality]
+    best = min(acceptable, key=lambda name: results[name]["seconds"]) if acceptable else None
+    return best, results
+
+
+def _installed_signature():
+    return {name: backend_version(name) for name in available_backends()}
+
+
+def load_calibration(calibration_path=CALIBRATION_PATH):
+    try:
+        with open(calibration_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def choose_backend(requested="auto", pdf_path=None, recalibrate=False, reference_path=None,
+                   calibration_path=CALIBRATION_PATH):
+    # An explicit backend always wins. "auto" reuses the last calibration
+    # for the same installed libraries, or calibrates on pdf_path.
+    if requested != "auto":
+        if requested not in BACKENDS:
+            raise ValueError(f"Unknown backend {requested!r}, choose from {', '.join(BACKENDS)}")
+        if not is_available(requested):
+            raise ValueError(f"Backend {requested!r} is not installed")
+        return requested
+
+    installed = available_backends()
+    if not installed:
+        raise ValueError(f"No PDF library installed, install one of {', '.join(BACKENDS)}")
+    signature = _installed_signature()
+
+    saved = None if recalibrate else load_calibration(calibration_path)
+    if saved and saved.get("installed") == signature and saved.get("backend") in installed:
+        return saved["backend"]
+
+    if pdf_path is None or not os.path.exists(pdf_path):
+        return DEFAULT_BACKEND if DEFAULT_BACKEND in installed else installed[0]
+
+    best, results = calibrate(pdf_path, reference_path)
+    best = best or (DEFAULT_BACKEND if DEFAULT_BACKEND in installed else installed[0])
+    with open(calibration_path, 'w', encoding='utf-8') as f:
+        json.dump({"backend": best, "installed": signature, "results": results}, f, indent=2)
+    return best
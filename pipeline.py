@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import sys
+
+import instrument
+from answer_key import describe_issues, read_answer_table
+from check_json import new_summary, print_summary, validate_tests
+from cleanup_json_v2 import clean_tests
+from parse_questions_v3 import CACHE_PATH, OUTPUT_PATH, parse_cached, parse_lines
+
+# parse -> clean -> validate in one pass over the tests, then a single write.
+# Replaces running parse_questions_v3.py, cleanup_json_v2.py and
+# check_json.py one after another, each re-reading the same JSON file.
+
+
+def write_json_atomic(path, data, indent=2):
+    # Write to a temp file next to the target and rename it into place,
+    # so the app never sees a half-written file. Skips the write when the
+    # content is unchanged.
+    text = json.dumps(data, indent=indent, ensure_ascii=False, separators=None if indent else (',', ':'))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # mkstemp creates the file as 0600; keep it readable like a normal write
+        os.chmod(tmp_path, os.stat(path).st_mode if os.path.exists(path) else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def parse_stage(input_path, cache_path=CACHE_PATH):
+    if cache_path:
+        yield from parse_cached(input_path, cache_path)
+    else:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            yield from parse_lines(f)
+
+
+def run_pipeline(input_path, output_path=OUTPUT_PATH, cache_path=CACHE_PATH, export_dir=None):
+    summary = new_summary()
+    # Parsing runs inside this stage as the generators are pulled; its own
+    # stages are timed separately, leaving clean + validate here
+    with instrument.stage("clean_validate"):
+        tests = list(validate_tests(clean_tests(parse_stage(input_path, cache_path)), summary))
+    with instrument.stage("key_check"):
+        summary['key_issues'] = read_answer_table(input_path).check(dict(summary['tests']))
+
+    with instrument.stage("json_dump"):
+        written = write_json_atomic(output_path, {"tests": tests})
+    if written:
+        instrument.log(instrument.INFO, f"Saved {len(tests)} tests to {output_path}")
+    else:
+        instrument.log(instrument.INFO, f"{output_path} is up to date")
+    if instrument.verbosity >= instrument.INFO:
+        print_summary(summary)
+        for message in describe_issues(summary['key_issues']):
+            print(f"  Key check: {message}")
+
+    if export_dir:
+        from export_bank import export_bank
+        with instrument.stage("export"):
+            export_bank(tests, export_dir)
+    return tests, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse, clean and check the screening tests in one pass.")
+    parser.add_argument("input", nargs="?", default='pdf_content.txt')
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("--no-cache", action="store_true", help="re-parse every test")
+    parser.add_argument("--export", nargs="?", const='public/data', metavar="DIR",
+                        help="also write the sharded game bundle (default: public/data)")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+
+    instrument.configure(args.verbosity, args.profile)
+    with instrument.profiled():
+        try:
+            run_pipeline(args.input, args.output, None if args.no_cache else CACHE_PATH, args.export)
+        except ValueError as e:
+            # The export refused a bank with schema errors
+            print(f"Error: {e}")
+            sys.exit(1)
+    if args.report:
+        instrument.write_report(args.report)
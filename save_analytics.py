@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import statistics
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import instrument
+from pipeline import write_json_atomic
+
+# Class progress reports from game saves collected on USB. The app keeps its
+# progress in the browser under STORAGE_KEY (zustand persist); a save file is
+# either that localStorage entry's value, {"state": {...}, "version": 0}, or
+# a dump of localStorage holding it as a JSON string under STORAGE_KEY.
+#
+# Saves are decoded straight into columns (one compact array per field,
+# per-unit counts as flat students x units arrays) instead of a dict per
+# student, in one pass. Large inputs are split over a process pool, each
+# worker decoding its own files into its own columns. The class of a save
+# is the folder it sits in, relative to the input folder.
+#
+#   python save_analytics.py saves/ [-o class_report.json] [-w 0]
+
+STORAGE_KEY = 'engquest-game-storage'
+CURRICULUM_PATH = 'src/data/english_curriculum.json'
+OUTPUT_PATH = 'class_report.json'
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 400
+CHUNKS_PER_WORKER = 4
+
+# A unit is mastered when it is completed and at least this share of its
+# flashcards were viewed and of its sentences were built
+MASTERY_SHARE = 0.8
+
+
+def unit_index(curriculum):
+    # (unit ids, {flashcard or sentence id: unit position}, cards per unit, sentences per unit)
+    unit_ids = [unit['id'] for unit in curriculum['units']]
+    item_unit = {}
+    cards, sentences = [], []
+    for u, unit in enumerate(curriculum['units']):
+        for card in unit.get('flashcards', []):
+            item_unit[card['id']] = u
+        for sentence in unit.get('sentenceBuilder', []):
+            item_unit[sentence['id']] = u
+        cards.append(len(unit.get('flashcards', [])))
+        sentences.append(len(unit.get('sentenceBuilder', [])))
+    return unit_ids, item_unit, cards, sentences
+
+
+def decode_save(raw):
+    # The persisted state, whichever of the export shapes it came in
+    data = json.loads(raw)
+    if isinstance(data, dict) and STORAGE_KEY in data:
+        data = data[STORAGE_KEY]
+        if isinstance(data, str):
+            data = json.loads(data)
+    if isinstance(data, dict) and isinstance(data.get('state'), dict):
+        data = data['state']
+    if not isinstance(data, dict) or 'xp' not in data:
+        raise ValueError("not an EngQuest save")
+    return data
+
+
+class SaveColumns:
+    __slots__ = ('units', 'names', 'classes', 'xp', 'level', 'coins', 'completed', 'cards', 'sentences')
+
+    def __init__(self, units):
+        self.units = units
+        self.names = []
+        self.classes = []
+        self.xp = array('l')
+        self.level = array('l')
+        self.coins = array('l')
+        # students x units, flattened
+        self.completed = array('B')
+        self.cards = array('H')
+        self.sentences = array('H')
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, name, class_name, state, unit_pos, item_unit):
+        # Every field is converted before any column grows, so a malformed
+        # save raises with the columns still the same length
+        numbers = array('l', (int(state.get('xp') or 0), int(state.get('level') or 1), int(state.get('coins') or 0)))
+        completed = array('B', bytes(self.units))
+        for unit_id in state.get('completedUnits') or []:
+            u = unit_pos.get(unit_id)
+            if u is not None:
+                completed[u] = 1
+        counts = []
+        for key in ('flashcardsViewed', 'sentenceBuilderCompleted'):
+            unit_counts = [0] * self.units
+            for item_id, done in (state.get(key) or {}).items():
+                u = item_unit.get(item_id)
+                if done and u is not None:
+                    unit_counts[u] += 1
+            counts.append(array('H', unit_counts))
+
+        self.names.append(state.get('playerName') or name)
+        self.classes.append(class_name)
+        self.xp.append(numbers[0])
+        self.level.append(numbers[1])
+        self.coins.append(numbers[2])
+        self.completed.extend(completed)
+        self.cards.extend(counts[0])
+        self.sentences.extend(counts[1])
+
+    def extend(self, other):
+        for name in self.__slots__[1:]:
+            getattr(self, name).extend(getattr(other, name))
+
+
+def _decode_files(job):
+    # Runs in a worker process for large inputs; returns the chunk's columns
+    # and the files that could not be decoded
+    paths, root, unit_ids, item_unit = job
+    unit_pos = {unit_id: u for u, unit_id in enumerate(unit_ids)}
+    columns = SaveColumns(len(unit_ids))
+    errors = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                state = decode_save(f.read())
+            class_name = os.path.relpath(os.path.dirname(path), root)
+            columns.append(os.path.splitext(os.path.basename(path))[0], "" if class_name == "." else class_name,
+                           state, unit_pos, item_unit)
+        except (OSError, ValueError, TypeError, AttributeError, OverflowError) as e:
+            errors.append((path, f"{type(e).__name__}: {e}"))
+    return columns, errors
+
+
+def save_files(root):
+    paths = []
+    for directory, _, names in os.walk(root):
+        paths += [os.path.join(directory, name) for name in sorted(names) if name.endswith('.json')]
+    return sorted(paths)
+
+
+def read_saves(root, curriculum, workers=1):
+    unit_ids, item_unit, _, _ = unit_index(curriculum)
+    paths = save_files(root)
+    instrument.count("files", len(paths))
+    if workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+        return _decode_files((paths, root, unit_ids, item_unit))
+
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, -(-len(paths) // (workers * CHUNKS_PER_WORKER)))
+    jobs = [(paths[i:i + chunk], root, unit_ids, item_unit) for i in range(0, len(paths), chunk)]
+    columns, errors = SaveColumns(len(unit_ids)), []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map keeps the file order, so the report doesn't depend on -w
+        for part, part_errors in pool.map(_decode_files, jobs):
+            columns.extend(part)
+            errors += part_errors
+    return columns, errors
+
+
+def summarize(columns, rows, unit_ids, cards, sentences):
+    # Report for the students at the given row numbers
+    n_units = len(unit_ids)
+    xp = [columns.xp[i] for i in rows]
+    report = {
+        "students": len(rows),
+        "xp": {"mean": round(statistics.fmean(xp), 1), "median": statistics.median(xp), "max": max(xp)},
+        "level": {"mean": round(statistics.fmean(columns.level[i] for i in rows), 2)},
+        "units": []
+    }
+    for u, unit_id in enumerate(unit_ids):
+        completed = card_share = sentence_share = mastered = 0
+        for i in rows:
+            k = i * n_units + u
+            done = columns.completed[k]
+            card = min(columns.cards[k] / cards[u], 1.0) if cards[u] else 1.0
+            sentence = min(columns.sentences[k] / sentences[u], 1.0) if sentences[u] else 1.0
+            completed += done
+            card_share += card
+            sentence_share += sentence
+            mastered += done and card >= MASTERY_SHARE and sentence >= MASTERY_SHARE
+        report["units"].append({
+            "id": unit_id,
+            "completed": round(completed / len(rows), 3),
+            "flashcardsViewed": round(card_share / len(rows), 3),
+            "sentencesBuilt": round(sentence_share / len(rows), 3),
+            "mastered": round(mastered / len(rows), 3)
+        })
+    return report
+
+
+def class_reports(columns, curriculum):
+    unit_ids, _, cards, sentences = unit_index(curriculum)
+    by_class = {}
+    for i, class_name in enumerate(columns.classes):
+        by_class.setdefault(class_name, []).append(i)
+    classes = [{"class": name, **summarize(columns, rows, unit_ids, cards, sentences)}
+               for name, rows in sorted(by_class.items())]
+    overall = summarize(columns, range(len(columns)), unit_ids, cards, sentences) if len(columns) else None
+    return {"classes": classes, "overall": overall}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Class completion and mastery reports from exported game saves.")
+    parser.add_argument("input", help="folder of save files, one subfolder per class")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH)
+    parser.add_argument("--curriculum", default=CURRICULUM_PATH)
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help=f"worker processes for {PARALLEL_MIN_FILES}+ files (1 = serial, 0 = one per CPU core)")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+
+    instrument.configure(args.verbosity, args.profile)
+    with open(args.curriculum, 'r', encoding='utf-8') as f:
+        curriculum = json.load(f)
+    with instrument.profiled():
+        with instrument.stage("decode"):
+            columns, errors = read_saves(args.input, curriculum, args.workers)
+        with instrument.stage("report"):
+            report = class_reports(columns, curriculum)
+        write_json_atomic(args.output, report)
+
+    for path, error in errors[:10]:
+        print(f"  Skipped {path}: {error}")
+    for entry in report['classes']:
+        units = " ".join(f"{u['completed']:.0%}" for u in entry['units'])
+        instrument.log(instrument.INFO, f"{entry['class'] or '(top folder)'}: {entry['students']} students, "
+                       f"mean XP {entry['xp']['mean']}, units completed {units}")
+    instrument.log(instrument.INFO, f"{len(columns)} saves in {len(report['classes'])} classes "
+                   f"({len(errors)} skipped) -> {args.output}")
+    if args.report:
+        instrument.write_report(args.report)
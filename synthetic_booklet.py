@@ -0,0 +1,123 @@
+import argparse
+import json
+import random
+
+# Synthetic MEB-style screening booklet with known ground truth, used to
+# benchmark the parsers and measure their accuracy. Mirrors the layout of
+# pdf_content.txt: page headers/footers, a standalone test number on each
+# test's first page, multi-line question text, stacked, two-per-line and
+# four-per-line options, and the answer key at the end.
+#
+#   python synthetic_booklet.py --tests 160 -o booklet.txt --truth truth.json
+
+HEADER = [
+    "http://odsgm.meb.gov.tr/kurslar/",
+    "MEB  2018 - 2019   ●   Ölçme, Değerlendirme ve Sınav Hizmetleri Genel Müdürlüğü"
+]
+FOOTER = "Cevap anahtarına ulaşmak için karekodu okutunuz."
+KEY_HEADER = [
+    "CEVAP ANAHTARI",
+    "ÖLÇME, DEĞERLENDİRME VE SINAV HİZMETLERİ GENEL MÜDÜRLÜĞÜ",
+    "5. Sınıf",
+    "İngilizce"
+]
+
+TOPICS = [
+    "Hello", "My Town", "Games and Hobbies", "My Daily Routine", "Health",
+    "Movies", "Party Time", "Fitness", "The Animal Shelter", "Festivals"
+]
+WORDS = (
+    "he she they we you my your friend school teacher park library museum "
+    "cinema bakery street morning evening weekend play read watch visit "
+    "like dislike often never always usually brother sister mother father "
+    "football chess music film party cake balloon horse puppy doctor "
+    "fever cold tired happy brave funny next to behind opposite near"
+).split()
+
+LETTERS = ['A', 'B', 'C', 'D']
+QUESTIONS_PER_TEST = 12
+QUESTIONS_PER_PAGE = 6
+LAYOUTS = ('stacked', 'pairs', 'inline')
+
+
+def make_phrase(rng, min_words, max_words):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+def make_options(rng):
+    options = []
+    while len(options) < 4:
+        option = make_phrase(rng, 1, 4)
+        if option not in options:
+            options.append(option)
+    return options
+
+
+def option_lines(options, layout):
+    marked = [f"{letter}) {option}" for letter, option in zip(LETTERS, options)]
+    if layout == 'stacked':
+        return marked
+    if layout == 'pairs':
+        return [f"{marked[0]} {marked[1]}", f"{marked[2]} {marked[3]}"]
+    return [" ".join(marked)]
+
+
+def generate_booklet(tests=16, seed=0):
+    # Returns (lines, truth); truth uses the screening_questions.json schema
+    rng = random.Random(seed)
+    lines = []
+    truth = []
+    key_rows = []
+
+    for test_id in range(1, tests + 1):
+        topic = rng.choice(TOPICS)
+        questions = []
+
+        for q_id in range(1, QUESTIONS_PER_TEST + 1):
+            if q_id == 1:
+                lines += HEADER + ["5. Sınıf", "İngilizce", str(test_id), topic]
+            elif (q_id - 1) % QUESTIONS_PER_PAGE == 0:
+                lines += [FOOTER] + HEADER + [f"{test_id} 5. Sınıf", "İngilizce", topic]
+
+            # Question text, sometimes wrapped over two lines
+            text_lines = [make_phrase(rng, 4, 10) + " - - - -."]
+            if rng.random() < 0.3:
+                text_lines.append(make_phrase(rng, 3, 8) + "?")
+            options = make_options(rng)
+            answer = rng.randrange(4)
+
+            lines.append(f"{q_id}. {text_lines[0]}")
+            lines += text_lines[1:]
+            lines += option_lines(options, rng.choice(LAYOUTS))
+
+            questions.append({
+                "id": q_id,
+                "text": " ".join(text_lines),
+                "options": options,
+                "userAnswer": None,
+                "correctAnswer": answer
+            })
+
+        lines.append(FOOTER)
+        key_rows.append(f"Test {test_id} " + " ".join(f"{q['id']}. {LETTERS[q['correctAnswer']]}" for q in questions))
+        truth.append({"id": test_id, "title": f"Test {test_id}", "questions": questions})
+
+    lines += KEY_HEADER + key_rows
+    return [line + "\n" for line in lines], truth
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic screening booklet text dump.")
+    parser.add_argument("--tests", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default='synthetic_booklet.txt')
+    parser.add_argument("--truth", help="also write the ground truth JSON here")
+    args = parser.parse_args()
+
+    lines, truth = generate_booklet(args.tests, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    if args.truth:
+        with open(args.truth, 'w', encoding='utf-8') as f:
+            json.dump({"tests": truth}, f, indent=2, ensure_ascii=False)
+    print(f"Wrote {args.tests} tests ({len(lines)} lines) to {args.output}")
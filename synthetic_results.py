@@ -0,0 +1,63 @@
+import argparse
+import json
+import math
+import random
+
+from item_stats import bank_items
+
+# Synthetic screening play results with known item parameters, for trying
+# item_stats.py before real sessions are exported. Every session plays a
+# few whole tests straight through, as the screening page does, and answers
+# by a two-parameter logistic model.
+#
+#   python synthetic_results.py --sessions 5000 -o results.jsonl --truth truth.json
+
+SCREENING_PATH = 'src/data/screening_questions.json'
+TESTS_PER_SESSION = (1, 3)
+
+
+def generate_results(tests, sessions=1000, seed=0):
+    # Returns (sessions, truth): truth has every item's a and b and every
+    # session's ability
+    rng = random.Random(seed)
+    params = {item: (math.exp(rng.gauss(0.2, 0.3)), rng.gauss(0.0, 1.0)) for item in bank_items(tests)}
+    results = []
+    abilities = {}
+    for s in range(sessions):
+        session_id = f"s{s + 1}"
+        theta = rng.gauss(0.0, 1.0)
+        abilities[session_id] = theta
+        answers = []
+        for test in rng.sample(tests, rng.randint(*TESTS_PER_SESSION)):
+            for q in test['questions']:
+                a, b = params[(test['id'], q['id'])]
+                p = 1.0 / (1.0 + math.exp(-a * (theta - b)))
+                answers.append({"test": test['id'], "question": q['id'], "correct": rng.random() < p})
+        results.append({"session": session_id, "answers": answers})
+
+    truth = {
+        "items": [{"test": t, "question": q, "a": a, "b": b} for (t, q), (a, b) in params.items()],
+        "abilities": abilities
+    }
+    return results, truth
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic screening play results.")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bank", default=SCREENING_PATH)
+    parser.add_argument("-o", "--output", default='results.jsonl')
+    parser.add_argument("--truth", help="also write the true item parameters and abilities")
+    args = parser.parse_args()
+
+    with open(args.bank, 'r', encoding='utf-8') as f:
+        tests = json.load(f)['tests']
+    results, truth = generate_results(tests, args.sessions, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for session in results:
+            f.write(json.dumps(session) + "\n")
+    if args.truth:
+        with open(args.truth, 'w', encoding='utf-8') as f:
+            json.dump(truth, f, indent=2)
+    print(f"Wrote {len(results)} sessions to {args.output}")
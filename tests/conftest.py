@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# The scripts live flat in the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import instrument  # noqa: E402
+
+
+@pytest.fixture
+def dump_path():
+    # The repository's own text dump of the screening booklet
+    return os.path.join(ROOT, 'pdf_content.txt')
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    instrument.configure(instrument.QUIET)
+    yield
+    instrument.configure(instrument.INFO)
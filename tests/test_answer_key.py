@@ -0,0 +1,38 @@
+import json
+
+from answer_key import AnswerKeyTable, read_answer_table
+from parse_questions_v3 import KEY_HEADER
+from pipeline import run_pipeline
+
+
+def keyless_dump(dump_path, tmp_path):
+    with open(dump_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    path = tmp_path / 'nokey.txt'
+    path.write_text(text[:text.index(KEY_HEADER)], encoding='utf-8')
+    return path
+
+
+def test_empty_table_checks_clean():
+    table = AnswerKeyTable({})
+    assert table.check() == {}
+    assert table.check({1: 12, 2: 12}) == {"missingTests": [1, 2]}
+
+
+def test_test_zero_is_dropped():
+    table = AnswerKeyTable.from_lines([KEY_HEADER, "Test 0 1.A 2.B", "Test 1 1.C 2.D"])
+    assert table.present == [1]
+    assert table.letter(1, 1) == 'C'
+    assert table.check({1: 2}) == {}
+
+
+def test_keyless_dump_still_writes_bank(dump_path, tmp_path):
+    dump = keyless_dump(dump_path, tmp_path)
+    output = tmp_path / 'questions.json'
+    tests, summary = run_pipeline(str(dump), str(output), cache_path=None)
+
+    assert read_answer_table(str(dump)).test_count == 0
+    assert tests and summary['key_issues']["missingTests"]
+    with open(output, 'r', encoding='utf-8') as f:
+        written = json.load(f)['tests']
+    assert all(q['correctAnswer'] == -1 for t in written for q in t['questions'])
@@ -0,0 +1,51 @@
+import json
+import os
+import shutil
+
+import batch_ingest
+from batch_ingest import INDEX_NAME, run_batch
+
+real_ingest_booklet = batch_ingest.ingest_booklet
+
+
+def crashing_ingest(path, output_dir, backend):
+    # Runs in the worker: kills it the way a crash inside a PDF library would
+    if os.path.basename(path).startswith('crash'):
+        os._exit(1)
+    return real_ingest_booklet(path, output_dir, backend)
+
+
+def make_booklets(dump_path, input_dir, names):
+    input_dir.mkdir()
+    for name in names:
+        shutil.copy(dump_path, input_dir / name)
+
+
+def test_crashing_worker_fails_only_its_booklet(dump_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_ingest, 'ingest_booklet', crashing_ingest)
+    make_booklets(dump_path, tmp_path / 'in', ['a.txt', 'b.txt', 'crash.txt', 'd.txt', 'e.txt'])
+
+    index = run_batch(str(tmp_path / 'in'), str(tmp_path / 'out'), workers=2)
+
+    status = {r['source']: r['status'] for r in index['booklets']}
+    assert status == {'a.txt': "ok", 'b.txt': "ok", 'crash.txt': "error", 'd.txt': "ok", 'e.txt': "ok"}
+    assert "BrokenProcessPool" in index['booklets'][2]['error']
+
+
+def test_index_booklet_does_not_overwrite_index(dump_path, tmp_path):
+    make_booklets(dump_path, tmp_path / 'in', ['index.txt', 'other.txt'])
+
+    run_batch(str(tmp_path / 'in'), str(tmp_path / 'out'), workers=1)
+
+    with open(tmp_path / 'out' / INDEX_NAME, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    assert index['ok'] == 2
+    assert {r['output'] for r in index['booklets']} == {'index.txt.json', 'other.json'}
+
+
+def test_notes_next_to_booklets_are_skipped(dump_path, tmp_path):
+    make_booklets(dump_path, tmp_path / 'in', ['booklet.txt'])
+    (tmp_path / 'in' / 'README.txt').write_text("Put the scanned booklets in this folder.\n", encoding='utf-8')
+    (tmp_path / 'in' / 'latin1.txt').write_bytes("Sınıf listesi".encode('cp1254'))
+
+    assert batch_ingest.discover_booklets(str(tmp_path / 'in')) == [str(tmp_path / 'in' / 'booklet.txt')]
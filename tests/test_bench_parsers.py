@@ -0,0 +1,33 @@
+import copy
+
+from bench_parsers import parse_v3, run_benchmark, score
+from synthetic_booklet import generate_booklet
+
+
+def test_truth_scores_perfectly():
+    _, truth = generate_booklet(tests=3, seed=1)
+    result = score(copy.deepcopy(truth), truth)
+    assert result == {"questions": 36, "found": 1.0, "text": 1.0, "options": 1.0, "answers": 1.0, "spurious": 0}
+
+
+def test_score_counts_each_mistake():
+    _, truth = generate_booklet(tests=1, seed=1)
+    parsed = copy.deepcopy(truth)
+    questions = parsed[0]['questions']
+    questions[0]['options'][3] += " Party Time"
+    questions[1]['correctAnswer'] = -1
+    questions.append(dict(questions[2], id=13))
+
+    result = score(parsed, truth)
+    assert result['found'] == 1.0
+    assert result['options'] == 11 / 12
+    assert result['answers'] == 11 / 12
+    assert result['spurious'] == 1
+
+
+def test_v3_reads_synthetic_booklet_exactly():
+    # Topic titles after every page header must not end up in the options
+    report = run_benchmark(tests=4, repeat=1, seed=2, parsers={"v3": parse_v3})
+    result = report['parsers']['v3']
+    assert (result['found'], result['text'], result['options'], result['answers']) == (1.0, 1.0, 1.0, 1.0)
+    assert result['spurious'] == 0
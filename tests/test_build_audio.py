@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import wave
+
+import pytest
+
+import build_audio
+from build_audio import MANIFEST_NAME, choose_backend, clip_name
+
+
+class StubBackend:
+    # Writes a short silent WAV instead of running a TTS program
+    name = "stub"
+
+    def __init__(self, voice="v1"):
+        self.voice = voice
+        self.rendered = []
+
+    def key(self):
+        return f"{self.name}:{self.voice}"
+
+    def render(self, text, wav_path):
+        if text == "Broken":
+            raise subprocess.CalledProcessError(1, ["stub"], stderr=b"cannot say it")
+        self.rendered.append(text)
+        with wave.open(wav_path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(b"\0\0" * 80)
+
+
+def curriculum(*units):
+    return {"units": [{"id": unit_id, "flashcards": [{"audio": text} for text in texts]}
+                      for unit_id, texts in enumerate(units, 1)]}
+
+
+@pytest.fixture(autouse=True)
+def plain_wav(monkeypatch):
+    # No encoder, whatever is installed on this machine
+    monkeypatch.setattr(build_audio, 'encoder', lambda: (".wav", None))
+
+
+def build(tmp_path, data, backend):
+    manifest, rendered, failed = build_audio.build_audio(data, str(tmp_path), backend, workers=2)
+    with open(tmp_path / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+        assert json.load(f) == manifest
+    return manifest, rendered, failed
+
+
+def clips(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path) if name.endswith(".wav"))
+
+
+def test_manifest_lists_content_addressed_clips(tmp_path):
+    backend = StubBackend()
+    manifest, rendered, failed = build(tmp_path, curriculum(["Hello", "Good  morning", "Hello"], ["Hello"]), backend)
+
+    hello, morning = (clip_name("stub:v1", text, ".wav") for text in ("Hello", "Good morning"))
+    assert manifest == {"backend": "stub:v1", "units": {"1": {"Hello": hello, "Good morning": morning},
+                                                         "2": {"Hello": hello}}}
+    assert sorted(backend.rendered) == ["Good morning", "Hello"]
+    assert clips(tmp_path) == sorted([hello, morning])
+    with wave.open(str(tmp_path / hello), 'rb') as f:
+        assert f.getnframes() == 80
+
+
+def test_rebuild_skips_existing_and_removes_stale_clips(tmp_path):
+    build(tmp_path, curriculum(["Hello", "Goodbye"]), StubBackend())
+
+    backend = StubBackend()
+    manifest, rendered, _ = build(tmp_path, curriculum(["Hello", "Thank you"]), backend)
+
+    assert backend.rendered == ["Thank you"]
+    assert list(rendered) == ["Thank you"]
+    assert clips(tmp_path) == sorted(manifest['units']["1"].values())
+    assert clip_name("stub:v1", "Goodbye", ".wav") not in clips(tmp_path)
+
+
+def test_other_voice_renders_again(tmp_path):
+    build(tmp_path, curriculum(["Hello"]), StubBackend("v1"))
+
+    backend = StubBackend("v2")
+    build(tmp_path, curriculum(["Hello"]), backend)
+
+    assert backend.rendered == ["Hello"]
+    assert clips(tmp_path) == [clip_name("stub:v2", "Hello", ".wav")]
+
+
+def test_failed_clip_stays_out_of_manifest(tmp_path):
+    manifest, _, failed = build(tmp_path, curriculum(["Hello", "Broken"]), StubBackend())
+
+    assert failed == {"Broken": "cannot say it"}
+    assert list(manifest['units']["1"]) == ["Hello"]
+    assert clips(tmp_path) == [clip_name("stub:v1", "Hello", ".wav")]
+
+
+def installed(monkeypatch, *programs):
+    monkeypatch.setattr(build_audio.shutil, 'which', lambda program: program if program in programs else None)
+
+
+def test_auto_picks_first_installed_backend(monkeypatch):
+    installed(monkeypatch, "pico2wave", "espeak-ng")
+    assert choose_backend().key() == "espeak-ng:en-gb:140"
+
+    installed(monkeypatch, "pico2wave")
+    assert choose_backend().key() == "pico2wave:en-GB"
+
+
+def test_piper_needs_a_voice(monkeypatch):
+    installed(monkeypatch, "piper")
+    with pytest.raises(ValueError, match="No TTS program"):
+        choose_backend()
+    assert choose_backend(voice="/voices/en_GB-alan.onnx").key() == "piper:en_GB-alan.onnx"
+
+
+def test_requested_backend_must_be_installed(monkeypatch):
+    installed(monkeypatch)
+    with pytest.raises(ValueError, match="not installed"):
+        choose_backend("espeak-ng")
+    with pytest.raises(ValueError, match="Unknown"):
+        choose_backend("festival")
@@ -0,0 +1,41 @@
+from answer_key import AnswerKeyTable
+from consensus_parse import align, consensus, normalize_options
+
+
+def question(q_id, text, options, answer=-1):
+    return {"id": q_id, "text": text, "options": options, "correctAnswer": answer}
+
+
+def booklet(questions):
+    return [{"id": 1, "questions": questions}]
+
+
+def test_repeated_text_keeps_both_questions():
+    reference = booklet([
+        question(1, "Look at the picture.", ["dog", "cat", "bird", "fish"]),
+        question(2, "Look at the picture.", ["red", "blue", "green", "pink"]),
+    ])
+    other = booklet([
+        question(1, "Look at the picture.", ["A) dog", "B) cat", "C) bird", "D) fish"]),
+        question(2, "Look at the picture.", ["A) red", "B) blue", "C) green", "D) pink"]),
+    ])
+
+    aligned = align({"v3": reference, "v2": other})
+
+    assert sorted(aligned) == [(1, 1), (1, 2)]
+    assert all(set(found) == {"v3", "v2"} for found in aligned.values())
+
+
+def test_all_parsers_agreeing_need_no_review():
+    reference = booklet([question(q, f"Question {q}", ["one", "two", "three", "four"]) for q in (1, 2)])
+    other = booklet([question(q, f"Question {q}", ["A) one B) two", "C) three D) four"]) for q in (1, 2)])
+    table = AnswerKeyTable({1: {1: 'A', 2: 'C'}})
+
+    tests = consensus({"v3": reference, "v2": other}, table, strategies=["v3", "v2"])
+
+    assert [q['correctAnswer'] for q in tests[0]['questions']] == [0, 2]
+    assert all(q['confidence'] == 1.0 for q in tests[0]['questions'])
+
+
+def test_glued_options_are_split():
+    assert normalize_options(["A) I - II B) II - I", "C) I - I D) II - II"]) == ("I - II", "II - I", "I - I", "II - II")
@@ -0,0 +1,52 @@
+import pytest
+
+import dedup_bank
+from dedup_bank import merge_bank
+
+TENSES = ["play", "plays", "played", "playing"]
+PASSAGE = ("Clara is from England. She speaks English, Spanish and French. At school, she loves art class most. "
+           "What is her favourite class?")
+
+
+def question(text, options, answer=0, booklet="a.json", q_id=1):
+    return ({"id": q_id, "text": text, "options": options, "correctAnswer": answer},
+            {"booklet": booklet, "test": 1, "question": q_id})
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def signatures(request, monkeypatch):
+    if request.param == "pure":
+        monkeypatch.setattr(dedup_bank, 'np', None)
+    elif dedup_bank.np is None:
+        pytest.skip("numpy is not installed")
+
+
+def sources(bank):
+    return sorted(sorted(s['booklet'] for s in q['sources']) for q in bank)
+
+
+def test_exact_duplicates_merge(signatures):
+    bank = merge_bank([question("I - - - - football.", TENSES, booklet="a.json"),
+                       question("i ---- FOOTBALL!", [o.upper() for o in TENSES], booklet="b.json")])
+    assert sources(bank) == [["a.json", "b.json"]]
+
+
+def test_near_duplicates_merge(signatures):
+    options = ["Art", "Math", "Music", "History"]
+    bank = merge_bank([question(PASSAGE, options, booklet="a.json"),
+                       question(PASSAGE.replace("class most", "clas most"), options, booklet="b.json")])
+    assert sources(bank) == [["a.json", "b.json"]]
+    assert "answerConflict" not in bank[0]
+
+
+def test_stems_one_word_apart_stay_apart(signatures):
+    bank = merge_bank([question("I - - - - football every day.", TENSES, answer=0, booklet="a.json"),
+                       question("He - - - - football every day.", TENSES, answer=1, booklet="b.json")])
+    assert sources(bank) == [["a.json"], ["b.json"]]
+    assert not any(q.get('answerConflict') for q in bank)
+
+
+def test_different_options_stay_apart(signatures):
+    bank = merge_bank([question(PASSAGE, ["Art", "Math", "Music", "History"], booklet="a.json"),
+                       question(PASSAGE, ["Art", "Math", "Music", "Science"], booklet="b.json")])
+    assert sources(bank) == [["a.json"], ["b.json"]]
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+import extract_pdf_to_file
+import page_cache
+from conftest import ROOT
+from engquest_ingest import parse_args
+
+
+def test_extract_options_match_the_script():
+    args = parse_args(["extract", "booklet.pdf"])
+    assert args.run is extract_pdf_to_file.main
+    assert args.cache_dir == page_cache.CACHE_DIR
+    assert args.cache_size * 1024 * 1024 == page_cache.MAX_BYTES
+    assert args.pdf == "booklet.pdf" and args.backend == "auto"
+
+
+def test_top_level_help_imports_no_script():
+    script = ("import sys, engquest_ingest; engquest_ingest.build_parser().format_help(); "
+              "print(sorted(m for m in ('extract_pdf_to_file', 'parse_questions_v3', 'consensus_parse', "
+              "'export_bank', 'build_audio') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
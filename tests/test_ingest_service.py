@@ -0,0 +1,98 @@
+import asyncio
+import os
+import shutil
+
+import ingest_service
+from ingest_service import IngestService
+
+real_ingest_booklet = ingest_service.ingest_booklet
+
+
+def crash_once(path, output_dir, backend):
+    # Kills the first worker that runs it, like a crash inside a PDF library
+    marker = os.path.join(os.path.dirname(output_dir), 'crashed')
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return real_ingest_booklet(path, output_dir, backend)
+
+
+def new_service(tmp_path, **kwargs):
+    return IngestService(str(tmp_path / 'out'), workers=1, work_dir=str(tmp_path / 'jobs'), **kwargs)
+
+
+def test_broken_pool_is_replaced(dump_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_service, 'ingest_booklet', crash_once)
+    booklet = tmp_path / 'booklet.txt'
+    shutil.copy(dump_path, booklet)
+
+    async def run():
+        service = new_service(tmp_path)
+        first_pool = service.pool
+        job = service.submit(str(booklet), path=str(booklet))
+        record = await service.run_job(asyncio.get_running_loop(), job)
+        service.pool.shutdown()
+        return service, first_pool, record
+
+    service, first_pool, record = asyncio.run(run())
+    assert record['status'] == "ok"
+    assert service.pool is not first_pool
+
+
+async def request(service, origin_header):
+    server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET /jobs HTTP/1.1\r\nOrigin: {origin_header}\r\n\r\n".encode('latin-1'))
+        await writer.drain()
+        response = (await reader.read()).decode('utf-8')
+        writer.close()
+    service.pool.shutdown()
+    return response
+
+
+def test_cors_only_allows_the_configured_origin(tmp_path):
+    response = asyncio.run(request(new_service(tmp_path), 'http://evil.example'))
+    assert "Access-Control-Allow-Origin: http://localhost:3000\r\n" in response
+    assert "Access-Control-Allow-Origin: *" not in response
+
+    response = asyncio.run(request(new_service(tmp_path, allow_origin=""), 'http://localhost:3000'))
+    assert "Access-Control-Allow-Origin" not in response
+
+
+async def drain(service, sources):
+    # Submit every upload, let one worker run the queue dry
+    jobs = [service.submit(name, data=data) for name, data in sources]
+    worker = asyncio.create_task(service.worker())
+    # A dead worker would leave the queue undrained forever
+    await asyncio.wait_for(service.queue.join(), 60)
+    worker.cancel()
+    service.pool.shutdown()
+    return jobs
+
+
+def test_failing_publish_keeps_the_worker(dump_path, tmp_path, monkeypatch):
+    async def full_disk(job):
+        raise OSError(28, "No space left on device")
+
+    data = open(dump_path, 'rb').read()
+    service = new_service(tmp_path)
+    monkeypatch.setattr(service, 'publish', full_disk)
+    jobs = asyncio.run(drain(service, [('a.txt', data), ('b.txt', data)]))
+
+    assert [job.status for job in jobs] == [ingest_service.FAILED, ingest_service.FAILED]
+    assert all("No space left" in job.record['error'] and job.finished for job in jobs)
+
+
+def test_same_name_uploads_both_published(dump_path, tmp_path):
+    data = open(dump_path, 'rb').read()
+    edited = data.replace(b"Test 1 ", b"Test 1  ", 1)
+    service = new_service(tmp_path)
+    jobs = asyncio.run(drain(service, [('booklet.txt', data), ('booklet.txt', edited), ('booklet.txt', data)]))
+
+    assert [job.status for job in jobs] == [ingest_service.DONE] * 3
+    records = service.read_index()['booklets']
+    assert len(records) == 2
+    assert {r['source'] for r in records} == {'booklet.txt'}
+    assert all(os.path.exists(tmp_path / 'out' / r['output']) for r in records)
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from item_stats import analyze, bank_items
+from synthetic_results import generate_results
+
+BANK = [{"id": t, "questions": [{"id": q} for q in range(1, 13)]} for t in range(1, 5)]
+
+
+def write_results(tmp_path, sessions):
+    results, _ = generate_results(BANK, sessions=sessions, seed=1)
+    path = tmp_path / 'results.jsonl'
+    path.write_text("".join(json.dumps(r) + "\n" for r in results), encoding='utf-8')
+    return [str(path)]
+
+
+def test_bank_items_drops_repeats():
+    tests = [{"id": 1, "questions": [{"id": 1}, {"id": 2}, {"id": 1}]}, {"id": 2, "questions": [{"id": 1}]}]
+    assert bank_items(tests) == [(1, 1), (1, 2), (2, 1)]
+
+
+@pytest.mark.parametrize("sessions", [0, 10])
+def test_too_few_sessions_gives_empty_plan(tmp_path, sessions):
+    stats, plan = analyze(BANK, write_results(tmp_path, sessions))
+    assert stats['sessions'] == sessions
+    assert len(stats['items']) == 48
+    assert not any('a' in item for item in stats['items'])
+    assert plan['nodes'] == [] and plan['expectedLength'] == 0
+
+
+def test_enough_sessions_fits_items(tmp_path):
+    stats, plan = analyze(BANK, write_results(tmp_path, 400))
+    assert all('a' in item for item in stats['items'])
+    assert plan['nodes']
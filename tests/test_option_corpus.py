@@ -0,0 +1,19 @@
+import json
+import os
+
+import pytest
+
+from conftest import ROOT
+from parse_questions_v3 import split_options
+
+# Regression corpus for the option splitter, cut from pdf_content.txt
+with open(os.path.join(ROOT, 'option_corpus.json'), 'r', encoding='utf-8') as f:
+    CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case['source'] for case in CASES])
+def test_split_options(case):
+    options, letters, ambiguous = split_options(case['raw'])
+    assert options == case['options']
+    assert "".join(letters) == case['letters']
+    assert ambiguous == case['ambiguous']
@@ -0,0 +1,29 @@
+import json
+
+import instrument
+from parse_questions_v3 import NOISE_FILTER, PARSER_VERSION, parse_cached, parse_lines
+
+
+def test_noise_filter_change_invalidates_cache(dump_path, tmp_path):
+    cache_path = str(tmp_path / 'cache.json')
+    first = parse_cached(dump_path, cache_path)
+    assert parse_cached(dump_path, cache_path) == first
+
+    # A learned line the cache has never seen: same dump, different tokens
+    noise = NOISE_FILTER.with_lines(["Animation"])
+    instrument.reset()
+    edited = parse_cached(dump_path, cache_path, noise)
+    assert instrument.counters["reparsed_tests"] == 1
+    with open(dump_path, 'r', encoding='utf-8') as f:
+        assert edited == parse_lines(f, noise)
+    assert edited != first
+
+
+def test_cache_from_older_parser_is_ignored(dump_path, tmp_path):
+    cache_path = tmp_path / 'cache.json'
+    parse_cached(dump_path, str(cache_path))
+    cache = json.loads(cache_path.read_text(encoding='utf-8'))
+    cache['version'] = PARSER_VERSION - 1
+    cache['tests'] = {d: [] for d in cache['tests']}
+    cache_path.write_text(json.dumps(cache), encoding='utf-8')
+    assert parse_cached(dump_path, str(cache_path))
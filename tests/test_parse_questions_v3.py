@@ -0,0 +1,36 @@
+from parse_questions_v3 import parse_lines
+from synthetic_booklet import generate_booklet
+
+
+def question_ids(tests):
+    return {t['id']: [q['id'] for q in t['questions']] for t in tests}
+
+
+def test_repo_dump_ids_unique_and_contiguous(dump_path):
+    with open(dump_path, 'r', encoding='utf-8') as f:
+        tests = parse_lines(f)
+    assert [t['id'] for t in tests] == list(range(1, 17))
+    for test_id, ids in question_ids(tests).items():
+        assert ids == list(range(1, len(ids) + 1)), f"Test {test_id}: {ids}"
+
+
+def test_passage_lists_stay_in_question_text():
+    lines = [
+        "8. Frank - - - -.", "A) is ill B) is hot C) is tired D) is cold",
+        "9.", "Health Problems Do's / Don'ts",
+        "1. Cough a. Drink lemon and mint tea.", "2. Headache b. Stay in bed and rest.",
+        "Doğru eşleştirmenin verildiği seçeneği işaretleyiniz.",
+        "A) 1a - 2b B) 1b - 2a",
+        "12.sorunun doğru seçeneğini verilen görsele göre işaretleyiniz.",
+        "10. Sorunun doğru cevabını davetiyeye göre işaretleyiniz.",
+        "A) yes B) no",
+    ]
+    questions = parse_lines(["1. First?", "A) a B) b"] + lines)[0]['questions']
+    assert [q['id'] for q in questions] == [1, 8, 9, 10]
+    assert "1. Cough" in questions[2]['text'] and "2. Headache" in questions[2]['text']
+    assert questions[3]['text'].startswith("Sorunun")
+
+
+def test_synthetic_booklet_ids_contiguous():
+    lines, truth = generate_booklet(16, seed=3)
+    assert question_ids(parse_lines(lines)) == question_ids(truth)
@@ -0,0 +1,100 @@
+import subprocess
+import sys
+
+import pytest
+
+import pdf_backends
+from conftest import ROOT
+
+
+def test_version_check_imports_no_pdf_library():
+    # A fresh interpreter: the test session may have imported them already
+    script = ("import sys, pdf_backends; pdf_backends._installed_signature(); "
+              "print([m for m in ('pypdf', 'pdfminer', 'PyPDF2') if m in sys.modules])")
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_backend_version_without_the_package(monkeypatch):
+    monkeypatch.setattr(pdf_backends.PypdfDocument, 'distribution', "no-such-package")
+    assert pdf_backends.backend_version("pypdf") == "pypdf-unknown"
+
+
+def write_font_pdf(path):
+    # Three pages with the same content stream: two in one font encoding,
+    # one in another, so the same byte reads as a different letter
+    pypdf = pytest.importorskip("pypdf")
+    from pypdf.generic import DictionaryObject, NameObject, StreamObject
+
+    writer = pypdf.PdfWriter()
+    for encoding in ("/WinAnsiEncoding", "/WinAnsiEncoding", "/MacRomanEncoding"):
+        font = DictionaryObject({NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+                                 NameObject("/BaseFont"): NameObject("/Helvetica"),
+                                 NameObject("/Encoding"): NameObject(encoding)})
+        contents = StreamObject()
+        contents.set_data(b"BT /F1 12 Tf 10 10 Td (Caf\x8e) Tj ET")
+        page = writer.add_blank_page(200, 200)
+        # Streams have to be indirect objects
+        page[NameObject("/Contents")] = writer._add_object(contents)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+    writer.write(str(path))
+
+
+def write_inherited_font_pdf(path):
+    # The same three pages, but with no /Resources of their own: the first
+    # two inherit them from one /Pages node, the third from another
+    font = "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /{} >>"
+    resources = "<< /Font << /F1 {} >> >>"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 3 /MediaBox [0 0 200 200] >>",
+        "<< /Type /Pages /Parent 2 0 R /Kids [6 0 R 7 0 R] /Count 2 /Resources "
+        + resources.format(font.format("WinAnsiEncoding")) + " >>",
+        "<< /Type /Pages /Parent 2 0 R /Kids [8 0 R] /Count 1 /Resources "
+        + resources.format(font.format("MacRomanEncoding")) + " >>",
+        None,
+        "<< /Type /Page /Parent 3 0 R /Contents 5 0 R >>",
+        "<< /Type /Page /Parent 3 0 R /Contents 5 0 R >>",
+        "<< /Type /Page /Parent 4 0 R /Contents 5 0 R >>",
+    ]
+    stream = b"BT /F1 12 Tf 10 10 Td (Caf\x8e) Tj ET"
+    data, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n".encode('ascii')
+        if body is None:
+            data += f"<< /Length {len(stream)} >>\nstream\n".encode('ascii') + stream + b"\nendstream"
+        else:
+            data += body.encode('ascii')
+        data += b"\nendobj\n"
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('ascii')
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii')
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("write_pdf", [write_font_pdf, write_inherited_font_pdf], ids=["own", "inherited"])
+@pytest.mark.parametrize("backend", ["pypdf", "pdfminer"])
+def test_page_digest_covers_fonts(tmp_path, backend, write_pdf):
+    if not pdf_backends.is_available(backend):
+        pytest.skip(f"{backend} is not installed")
+    write_pdf(tmp_path / 'fonts.pdf')
+
+    document = pdf_backends.open_document(str(tmp_path / 'fonts.pdf'), backend)
+    try:
+        digests = [document.page_digest(index) for index in range(3)]
+        texts = [document.page_text(index) for index in range(3)]
+    finally:
+        document.close()
+    assert digests[0] == digests[1] and texts[0] == texts[1]
+    assert digests[0] != digests[2] and texts[0] != texts[2]
+
+
+def test_inherited_resources_walk_up_the_page_tree():
+    root = {'/Resources': "root"}
+    node = {'/Parent': root}
+    assert pdf_backends.inherited({'/Parent': node}, '/Resources') == "root"
+    assert pdf_backends.inherited({'/Resources': "own", '/Parent': node}, '/Resources') == "own"
+    assert pdf_backends.inherited({'/Parent': {}}, '/Resources') is None
@@ -0,0 +1,35 @@
+import json
+
+from save_analytics import STORAGE_KEY, class_reports, read_saves
+
+CURRICULUM = {"units": [
+    {"id": 1, "flashcards": [{"id": "f1-1"}, {"id": "f1-2"}], "sentenceBuilder": [{"id": "sb1-1"}]},
+    {"id": 2, "flashcards": [{"id": "f2-1"}], "sentenceBuilder": []},
+]}
+
+
+def write_save(path, state):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({STORAGE_KEY: json.dumps({"state": state, "version": 0})}), encoding='utf-8')
+
+
+def test_malformed_save_is_skipped_whole(tmp_path):
+    write_save(tmp_path / '5A' / 'ali.json', {
+        "playerName": "Ali", "xp": 120, "level": 3, "coins": 40, "completedUnits": [1],
+        "flashcardsViewed": {"f1-1": True, "f1-2": True}, "sentenceBuilderCompleted": {"sb1-1": True}})
+    # Fails on "level" after the name and xp would already have been appended
+    write_save(tmp_path / '5A' / 'broken.json', {
+        "playerName": "Broken", "xp": 50, "level": "max", "completedUnits": [1, 2],
+        "flashcardsViewed": {"f2-1": True}})
+
+    columns, errors = read_saves(str(tmp_path), CURRICULUM)
+
+    assert [path.endswith('broken.json') for path, _ in errors] == [True]
+    assert columns.names == ["Ali"] and columns.classes == ["5A"]
+    assert list(columns.xp) == [120] and list(columns.level) == [3] and list(columns.coins) == [40]
+    assert list(columns.completed) == [1, 0]
+    assert list(columns.cards) == [2, 0] and list(columns.sentences) == [1, 0]
+
+    report = class_reports(columns, CURRICULUM)
+    assert report['overall']['students'] == 1
+    assert report['overall']['units'][0]['mastered'] == 1.0
@@ -0,0 +1,20 @@
+from validate_banks import ERROR, WARNING, validate_curriculum, validate_screening
+
+
+def severities(check):
+    return [(severity, message) for severity, _, message in check.issues]
+
+
+def test_empty_screening_options_are_a_warning():
+    # Picture options: the dump has their letters but no text
+    tests = [{"id": 1, "questions": [{"id": 1, "text": "Which one is Brandon?", "options": ["", "", "", ""],
+                                      "correctAnswer": 2}]}]
+    check = validate_screening({"tests": tests})
+    assert severities(check) == [(WARNING, "empty options 0, 1, 2, 3")]
+    assert check.counts() == (0, 1)
+
+
+def test_empty_curriculum_options_are_an_error():
+    units = [{"id": 1, "title": "Unit 1", "bossQuiz": [{"id": "q1", "question": "?", "options": ["yes", " "],
+                                                        "correctAnswer": 0}]}]
+    assert severities(validate_curriculum({"units": units})) == [(ERROR, "empty option 1")]
@@ -0,0 +1,81 @@
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+
+# Memory-mapped view of a PDF text dump with a line-offset index.
+# The file is mapped once and the offsets of every line start are indexed
+# in a single scan; lines are decoded only when asked for, so parsing a
+# slice (one test, or the answer key) never loads the rest of the file.
+#
+#   with TextDump('pdf_content.txt') as dump:
+#       key_line = dump.find_line("CEVAP ANAHTARI", last=True)
+#       for line in dump.lines(key_line):
+#           ...
+
+
+class TextDump:
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # Empty files can't be mapped; an empty bytes object has the same API
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.size = size
+        self.offsets = self._index_lines()
+
+    def _index_lines(self):
+        # offsets[i] is where line i starts, the last entry is the file size
+        offsets = array('Q', [0])
+        find = self.data.find
+        pos = find(b"\n")
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = find(b"\n", pos + 1)
+        if offsets[-1] != self.size:
+            offsets.append(self.size)
+        return offsets
+
+    @property
+    def line_count(self):
+        return len(self.offsets) - 1
+
+    def digest(self):
+        import hashlib
+
+        return hashlib.sha1(self.data).hexdigest()
+
+    def line_at(self, byte_offset):
+        return bisect_right(self.offsets, byte_offset) - 1
+
+    def find_line(self, text, last=False):
+        # Index of the first (or last) line containing text, or None
+        needle = text.encode(self.encoding)
+        pos = self.data.rfind(needle) if last else self.data.find(needle)
+        return None if pos == -1 else self.line_at(pos)
+
+    def byte_range(self, start_line, stop_line=None):
+        stop_line = self.line_count if stop_line is None else stop_line
+        return self.offsets[start_line], self.offsets[stop_line]
+
+    def lines(self, start_line=0, stop_line=None):
+        # Decoded lazily, one line at a time
+        stop_line = self.line_count if stop_line is None else stop_line
+        data, offsets, encoding = self.data, self.offsets, self.encoding
+        for i in range(start_line, stop_line):
+            yield data[offsets[i]:offsets[i + 1]].decode(encoding)
+
+    def lines_between(self, start_byte, end_byte):
+        return self.lines(self.line_at(start_byte), self.line_at(end_byte))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
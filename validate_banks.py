@@ -0,0 +1,187 @@
+import argparse
+import json
+import sys
+from collections import Counter
+
+# Schema checks for both question banks, run before every export so broken
+# entries are caught here instead of in the browser. Each bank is loaded
+# once and walked once; ids go into an index on the way, which is how
+# duplicates are found (and what callers get back for lookups).
+#
+#   errors    the app would misbehave: duplicate ids, correctAnswer outside
+#             the options, sentenceBuilder words that can't build the
+#             sentence, missing or empty fields
+#   warnings  playable but worth a look: unkeyed screening questions, and
+#             empty screening options (picture options the dump has no
+#             text for; the app shows their letters only)
+#
+#   python validate_banks.py [--screening PATH] [--curriculum PATH]
+
+SCREENING_PATH = 'src/data/screening_questions.json'
+CURRICULUM_PATH = 'src/data/english_curriculum.json'
+
+ERROR = "error"
+WARNING = "warning"
+
+# Fields every entry must have, non-empty, per collection
+UNIT_FIELDS = ('id', 'title')
+ITEM_FIELDS = {
+    'flashcards': ('id', 'word', 'translation'),
+    'sentenceBuilder': ('id', 'correctSentence', 'words'),
+    'bossQuiz': ('id', 'question', 'options', 'correctAnswer'),
+    'readingQuestions': ('id', 'text', 'question', 'options', 'correctAnswer'),
+}
+SHOP_FIELDS = ('id', 'name', 'price', 'category')
+TEST_FIELDS = ('id', 'questions')
+QUESTION_FIELDS = ('id', 'text', 'options', 'correctAnswer')
+
+
+def is_empty(value):
+    return value is None or value == "" or value == [] or (isinstance(value, str) and not value.strip())
+
+
+class BankCheck:
+    # Issues and the id index of one bank, filled in a single pass
+    def __init__(self, name):
+        self.name = name
+        self.issues = []
+        self.index = {}
+
+    def add(self, severity, where, message):
+        self.issues.append((severity, f"{self.name}: {where}", message))
+
+    def register(self, scope, item_id, where):
+        # scope keeps id spaces apart, e.g. question ids repeat across tests
+        first = self.index.setdefault((scope, item_id), where)
+        if first != where:
+            self.add(ERROR, where, f"duplicate id {item_id!r}, first used at {first}")
+
+    def fields(self, entry, names, where):
+        if not isinstance(entry, dict):
+            self.add(ERROR, where, "not an object")
+            return False
+        missing = [name for name in names if is_empty(entry.get(name))]
+        if missing:
+            self.add(ERROR, where, f"missing or empty {', '.join(missing)}")
+        return True
+
+    def options(self, entry, where, unkeyed_ok=False, pictures_ok=False):
+        options = entry.get('options')
+        if not isinstance(options, list):
+            return
+        empty = [str(i) for i, option in enumerate(options) if not isinstance(option, str) or is_empty(option)]
+        if empty:
+            self.add(WARNING if pictures_ok else ERROR, where,
+                     f"empty option{'s' if len(empty) > 1 else ''} {', '.join(empty)}")
+        answer = entry.get('correctAnswer')
+        if answer == -1 and unkeyed_ok:
+            self.add(WARNING, where, "no answer key (correctAnswer -1)")
+        elif answer is not None and (type(answer) is not int or not 0 <= answer < len(options)):
+            self.add(ERROR, where, f"correctAnswer {answer!r} is outside its {len(options)} options")
+
+    def sentence(self, entry, where):
+        # The app joins the chosen words with single spaces and compares the
+        # result to correctSentence, so the words must be exactly its tokens
+        words, sentence = entry.get('words'), entry.get('correctSentence')
+        if not isinstance(words, list) or not isinstance(sentence, str):
+            return
+        if Counter(words) != Counter(sentence.split(' ')):
+            self.add(ERROR, where, f"words {words} don't build {sentence!r}")
+
+    def counts(self):
+        errors = sum(1 for severity, _, _ in self.issues if severity == ERROR)
+        return errors, len(self.issues) - errors
+
+
+def validate_screening(data, name='screening'):
+    check = BankCheck(name)
+    tests = data.get('tests') if isinstance(data, dict) else None
+    if not isinstance(tests, list):
+        check.add(ERROR, "tests", "missing test list")
+        return check
+    for t, test in enumerate(tests):
+        where = f"tests[{t}]"
+        if not check.fields(test, TEST_FIELDS, where):
+            continue
+        check.register('test', test.get('id'), where)
+        for q, question in enumerate(test.get('questions') or []):
+            q_where = f"test {test.get('id')} questions[{q}]"
+            if check.fields(question, QUESTION_FIELDS, q_where):
+                check.register(('question', test.get('id')), question.get('id'), q_where)
+                check.options(question, q_where, unkeyed_ok=True, pictures_ok=True)
+    return check
+
+
+def validate_curriculum(data, name='curriculum'):
+    check = BankCheck(name)
+    units = data.get('units') if isinstance(data, dict) else None
+    if not isinstance(units, list):
+        check.add(ERROR, "units", "missing unit list")
+        return check
+    for u, unit in enumerate(units):
+        where = f"units[{u}]"
+        if not check.fields(unit, UNIT_FIELDS, where):
+            continue
+        check.register('unit', unit.get('id'), where)
+        for collection, names in ITEM_FIELDS.items():
+            items = unit.get(collection, [])
+            if not isinstance(items, list):
+                check.add(ERROR, f"unit {unit.get('id')} {collection}", "not a list")
+                continue
+            for i, item in enumerate(items):
+                i_where = f"unit {unit.get('id')} {collection}[{i}]"
+                if not check.fields(item, names, i_where):
+                    continue
+                # Progress is stored per item id across all units, so item
+                # ids share one space
+                check.register('item', item.get('id'), i_where)
+                if collection == 'sentenceBuilder':
+                    check.sentence(item, i_where)
+                else:
+                    check.options(item, i_where)
+    for s, item in enumerate(data.get('shopItems', [])):
+        where = f"shopItems[{s}]"
+        if check.fields(item, SHOP_FIELDS, where):
+            check.register('shop', item.get('id'), where)
+    return check
+
+
+def validate_banks(tests=None, curriculum=None, screening_path=SCREENING_PATH, curriculum_path=CURRICULUM_PATH):
+    # Already loaded banks are checked as given; the rest are read from disk
+    if tests is None:
+        with open(screening_path, 'r', encoding='utf-8') as f:
+            screening = json.load(f)
+    else:
+        screening = {"tests": tests}
+    if curriculum is None:
+        with open(curriculum_path, 'r', encoding='utf-8') as f:
+            curriculum = json.load(f)
+    return [validate_screening(screening), validate_curriculum(curriculum)]
+
+
+def describe_checks(checks, limit=None, severity=None):
+    # Errors first, so a limit never hides one behind warnings
+    issues = sorted((issue for check in checks for issue in check.issues
+                     if severity is None or issue[0] == severity), key=lambda issue: issue[0] != ERROR)
+    messages = [f"{level.upper()} {where}: {message}" for level, where, message in issues]
+    return messages[:limit] if limit else messages
+
+
+def error_count(checks):
+    return sum(check.counts()[0] for check in checks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check both question banks for schema errors.")
+    parser.add_argument("--screening", default=SCREENING_PATH)
+    parser.add_argument("--curriculum", default=CURRICULUM_PATH)
+    parser.add_argument("--limit", type=int, default=50, help="issues to print (0 = all)")
+    args = parser.parse_args()
+
+    checks = validate_banks(screening_path=args.screening, curriculum_path=args.curriculum)
+    for message in describe_checks(checks, args.limit):
+        print(message)
+    for check in checks:
+        errors, warnings = check.counts()
+        print(f"{check.name}: {len(check.index)} ids, {errors} errors, {warnings} warnings")
+    sys.exit(1 if error_count(checks) else 0)